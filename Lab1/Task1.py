@@ -1,4 +1,17 @@
 #!/usr/bin/env python3
+import os
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alphabet import LATIN
+from file_mode import build_parser, run_file_job
+
+ALPHABET = LATIN.letters
+NON_LETTER_BYTES = bytes(b for b in range(256) if chr(b) not in LATIN.letter_set)
+NON_LETTER_PATTERN = re.compile('[^A-Z]+')
+IN_PLACE_CHUNK = 1 << 16
 
 def validate_key(key):
     try:
@@ -8,39 +21,49 @@ def validate_key(key):
         return False
 
 def validate_text(text):
-    for char in text:
-        if not char.isalpha():
-            return False
-    return True
+    return LATIN.validate(text)
 
 def preprocess_text(text):
     return text.upper().replace(' ', '')
 
 def letter_to_number(letter):
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    return alphabet.index(letter)
+    return LATIN.number(letter)
 
 def number_to_letter(number):
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    return alphabet[number % 26]
+    return LATIN.letter(number)
+
+def caesar_transform(data, shift, strict=False):
+    if isinstance(data, str):
+        result = data.translate(LATIN.shift_table(shift))
+        if result and not (result.isascii() and result.isalpha()):
+            if strict:
+                raise ValueError("Invalid characters. Only letters (A-Z or a-z) are allowed.")
+            result = NON_LETTER_PATTERN.sub('', result)
+        return result
+    result = data.translate(LATIN.shift_bytes_table(shift), b' ')
+    if result and not result.isalpha():
+        if strict:
+            raise ValueError("Invalid characters. Only letters (A-Z or a-z) are allowed.")
+        result = result.translate(None, NON_LETTER_BYTES)
+    return result
+
+def caesar_transform_inplace(buffer, shift):
+    # Same result as caesar_transform, written back into the bytearray: each chunk is shifted
+    # and compacted towards the front, so only one chunk is held outside the buffer.
+    write = 0
+    with memoryview(buffer) as view:
+        for start in range(0, len(buffer), IN_PLACE_CHUNK):
+            chunk = caesar_transform(view[start:start + IN_PLACE_CHUNK].tobytes(), shift)
+            view[write:write + len(chunk)] = chunk
+            write += len(chunk)
+    del buffer[write:]
+    return buffer
 
 def encrypt_caesar(plaintext, key):
-    ciphertext = ""
-    for char in plaintext:
-        if char.isalpha():
-            letter_num = letter_to_number(char)
-            encrypted_num = (letter_num + key) % 26
-            ciphertext += number_to_letter(encrypted_num)
-    return ciphertext
+    return caesar_transform(plaintext, key)
 
 def decrypt_caesar(ciphertext, key):
-    plaintext = ""
-    for char in ciphertext:
-        if char.isalpha():
-            letter_num = letter_to_number(char)
-            decrypted_num = (letter_num - key) % 26
-            plaintext += number_to_letter(decrypted_num)
-    return plaintext
+    return caesar_transform(ciphertext, -key)
 
 def get_operation():
     while True:
@@ -108,5 +131,17 @@ def main():
     except Exception as e:
         print(f"\nAn unexpected error occurred: {e}")
 
+def run_cli(argv):
+    parser = build_parser("Caesar Cipher - non-interactive file mode")
+    parser.add_argument("-k", "--key", required=True, help="Caesar shift (1-25)")
+    args = parser.parse_args(argv)
+    if not validate_key(args.key):
+        print("Invalid key. Please enter a number between 1 and 25 inclusive.", file=sys.stderr)
+        return 2
+    shift = int(args.key) if args.operation == 'encrypt' else -int(args.key)
+    return run_file_job(lambda chunk: caesar_transform(chunk, shift), args)
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main()
@@ -1,7 +1,66 @@
 #!/usr/bin/env python3
-import string
-
-STANDARD_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+import os
+import re
+import sys
+from functools import lru_cache
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alphabet import LATIN, Alphabet, keyword_alphabet, permuted_letters
+from file_mode import build_parser, run_file_job
+
+STANDARD_ALPHABET = LATIN.letters
+NON_LETTER_BYTES = bytes(b for b in range(256) if chr(b) not in LATIN.letter_set)
+KEY_CACHE_SIZE = 256
+
+class CompiledKeys:
+    __slots__ = ('key1', 'alphabet', 'encrypt_table', 'decrypt_table',
+                 'encrypt_bytes_table', 'decrypt_bytes_table', 'non_letters')
+
+    def __init__(self, key1, alphabet):
+        self.key1 = key1
+        self.alphabet = alphabet
+        self.encrypt_table = alphabet.shift_table(key1)
+        self.decrypt_table = alphabet.shift_table(-key1)
+        self.non_letters = re.compile(f"[^{re.escape(alphabet.letters)}]+")
+        # Alphabets with non-ASCII letters have no bytes tables; their bytes go through the str path.
+        self.encrypt_bytes_table = alphabet.shift_bytes_table(key1) if alphabet.is_ascii else None
+        self.decrypt_bytes_table = alphabet.shift_bytes_table(-key1) if alphabet.is_ascii else None
+
+    @property
+    def permuted_alphabet(self):
+        return self.alphabet.letters
+
+    def translate(self, text, table):
+        # Like the bytes path and Task1.caesar_transform: anything that is not a letter is dropped.
+        result = text.translate(table)
+        if result and not (self.alphabet.is_ascii and result.isascii() and result.isalpha() and result.isupper()):
+            result = self.non_letters.sub('', result)
+        return result
+
+    def encrypt(self, plaintext):
+        return self.translate(plaintext, self.encrypt_table)
+
+    def decrypt(self, ciphertext):
+        return self.translate(ciphertext, self.decrypt_table)
+
+    def encrypt_bytes(self, data):
+        if self.encrypt_bytes_table is None:
+            return self.encrypt(bytes(data).decode('utf-8')).encode('utf-8')
+        return data.translate(self.encrypt_bytes_table, NON_LETTER_BYTES)
+
+    def decrypt_bytes(self, data):
+        if self.decrypt_bytes_table is None:
+            return self.decrypt(bytes(data).decode('utf-8')).encode('utf-8')
+        return data.translate(self.decrypt_bytes_table, NON_LETTER_BYTES)
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compile_permuted_alphabet(key1, permuted_alphabet):
+    return CompiledKeys(key1, Alphabet(permuted_alphabet))
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compile_keys(key1, key2):
+    return CompiledKeys(key1, keyword_alphabet(key2.upper()))
 
 def validate_key1(key):
     try:
@@ -11,55 +70,23 @@ def validate_key1(key):
         return False
 
 def validate_key2(key):
-    if len(key) < 7:
-        return False
-    for char in key:
-        if not char.isalpha():
-            return False
-    return True
+    # The keyword permutes the Latin alphabet, so it may only use its letters.
+    return len(key) >= 7 and LATIN.validate(key)
 
 def validate_text(text):
-    for char in text:
-        if not char.isalpha():
-            return False
-    return True
+    return LATIN.validate(text)
 
 def preprocess_text(text):
     return text.upper().replace(' ', '')
 
 def generate_permuted_alphabet(key2):
-    key2_upper = key2.upper()
-    permuted_part = ""
-    for char in key2_upper:
-        if char not in permuted_part:
-            permuted_part += char
-    remaining_part = ""
-    for char in STANDARD_ALPHABET:
-        if char not in permuted_part:
-            remaining_part += char
-    return permuted_part + remaining_part
-
-def permuted_letter_to_number(letter, permuted_alphabet):
-    return permuted_alphabet.index(letter)
-
-def permuted_number_to_letter(number, permuted_alphabet):
-    return permuted_alphabet[number % 26]
+    return permuted_letters(key2)
 
 def encrypt_caesar_2keys(plaintext, key1, permuted_alphabet):
-    ciphertext = ""
-    for char in plaintext:
-        letter_num = permuted_letter_to_number(char, permuted_alphabet)
-        encrypted_num = (letter_num + key1) % 26
-        ciphertext += permuted_number_to_letter(encrypted_num, permuted_alphabet)
-    return ciphertext
+    return compile_permuted_alphabet(key1, permuted_alphabet).encrypt(plaintext)
 
 def decrypt_caesar_2keys(ciphertext, key1, permuted_alphabet):
-    plaintext = ""
-    for char in ciphertext:
-        letter_num = permuted_letter_to_number(char, permuted_alphabet)
-        decrypted_num = (letter_num - key1) % 26
-        plaintext += permuted_number_to_letter(decrypted_num, permuted_alphabet)
-    return plaintext
+    return compile_permuted_alphabet(key1, permuted_alphabet).decrypt(ciphertext)
 
 def get_operation():
     while True:
@@ -141,5 +168,22 @@ def main():
     except Exception as e:
         print(f"\nAn unexpected error occurred: {e}")
 
+def run_cli(argv):
+    parser = build_parser("Caesar Cipher with Permutation - non-interactive file mode")
+    parser.add_argument("-k1", "--key1", required=True, help="Caesar shift (1-25)")
+    parser.add_argument("-k2", "--key2", required=True, help="permutation keyword (min 7 letters)")
+    args = parser.parse_args(argv)
+    if not validate_key1(args.key1):
+        print("Invalid key 1. Please enter a number between 1 and 25 inclusive.", file=sys.stderr)
+        return 2
+    if not validate_key2(args.key2):
+        print("Invalid key 2. Please enter only Latin letters with at least 7 characters.", file=sys.stderr)
+        return 2
+    keys = compile_keys(int(args.key1), args.key2)
+    transform = keys.encrypt_bytes if args.operation == 'encrypt' else keys.decrypt_bytes
+    return run_file_job(transform, args)
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main()
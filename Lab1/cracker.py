@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Task1 import decrypt_caesar
+
+ENGLISH_FREQUENCIES = np.array([
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153, 0.772, 4.025, 2.406,
+    6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 0.978, 2.360, 0.150, 1.974, 0.074
+]) / 100.0
+
+CANDIDATE_KEYS = np.arange(1, 26)
+# SHIFT_INDEX[k, j] is the ciphertext letter that decrypts to letter j under key k.
+SHIFT_INDEX = (np.arange(26)[None, :] + CANDIDATE_KEYS[:, None]) % 26
+METHODS = ("loglik", "chi2")
+
+
+def letter_histograms(ciphertexts):
+    data = [text.encode('ascii', 'ignore').upper() if isinstance(text, str) else bytes(text).upper()
+            for text in ciphertexts]
+    lengths = np.fromiter((len(item) for item in data), dtype=np.int64, count=len(data))
+    letters = np.frombuffer(b''.join(data), dtype=np.uint8).astype(np.int64) - ord('A')
+    rows = np.repeat(np.arange(len(data), dtype=np.int64), lengths)
+    valid = (letters >= 0) & (letters < 26)
+    flat = np.bincount(rows[valid] * 26 + letters[valid], minlength=len(data) * 26)
+    return flat.reshape(len(data), 26)
+
+
+def loglik_matrix(frequencies=ENGLISH_FREQUENCIES):
+    log_freq = np.log(np.maximum(frequencies, 1e-6))
+    matrix = np.zeros((26, len(CANDIDATE_KEYS)))
+    matrix[SHIFT_INDEX.T, np.arange(len(CANDIDATE_KEYS))[None, :]] = log_freq[:, None]
+    return matrix
+
+
+LOGLIK_MATRIX = loglik_matrix()
+
+
+def score_shifts(histograms, method="loglik", frequencies=ENGLISH_FREQUENCIES):
+    histograms = np.atleast_2d(np.asarray(histograms, dtype=np.float64))
+    if method == "loglik":
+        matrix = LOGLIK_MATRIX if frequencies is ENGLISH_FREQUENCIES else loglik_matrix(frequencies)
+        return histograms @ matrix
+    if method == "chi2":
+        totals = histograms.sum(axis=1)[:, None, None]
+        expected = np.maximum(totals * frequencies[None, None, :], 1e-12)
+        observed = histograms[:, SHIFT_INDEX]
+        return -(((observed - expected) ** 2) / expected).sum(axis=2)
+    raise ValueError(f"Unknown scoring method '{method}'. Choose one of: {', '.join(METHODS)}")
+
+
+def rank_keys(scores, top_k=3):
+    top_k = max(1, min(top_k, scores.shape[1]))
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+    return CANDIDATE_KEYS[order], np.take_along_axis(scores, order, axis=1)
+
+
+def crack_batch(ciphertexts, top_k=3, method="loglik"):
+    keys, scores = rank_keys(score_shifts(letter_histograms(ciphertexts), method), top_k)
+    results = []
+    for text, row_keys, row_scores in zip(ciphertexts, keys.tolist(), scores.tolist()):
+        results.append([(key, score, decrypt_caesar(text, key)) for key, score in zip(row_keys, row_scores)])
+    return results
+
+
+def crack_caesar(ciphertext, top_k=3, method="loglik"):
+    return crack_batch([ciphertext], top_k, method)[0]
+
+
+def crack_corpus(ciphertexts, top_k=3, method="loglik", workers=None, batch_size=10000):
+    ciphertexts = list(ciphertexts)
+    batches = [ciphertexts[i:i + batch_size] for i in range(0, len(ciphertexts), batch_size)]
+    if workers == 1 or len(batches) <= 1:
+        return [result for batch in batches for result in crack_batch(batch, top_k, method)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(crack_batch, batches, [top_k] * len(batches), [method] * len(batches))
+        return [result for part in parts for result in part]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Caesar cipher cracker (frequency scoring of all 25 keys)")
+    parser.add_argument("-i", "--input", default="-", help="file with one ciphertext per line ('-' for stdin)")
+    parser.add_argument("--top", type=int, default=3, help="number of candidate keys to show")
+    parser.add_argument("--method", choices=METHODS, default="loglik")
+    parser.add_argument("--workers", type=int, default=1, help="process pool size for large corpora")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding='utf-8')
+    with source:
+        ciphertexts = [line.strip() for line in source if line.strip()]
+
+    results = crack_corpus(ciphertexts, args.top, args.method, args.workers, args.batch_size)
+    for ciphertext, candidates in zip(ciphertexts, results):
+        print("=" * 60)
+        print(f"Ciphertext: {ciphertext}")
+        for rank, (key, score, plaintext) in enumerate(candidates, 1):
+            print(f"  {rank}. key={key:2d} score={score:10.2f} -> {plaintext}")
+
+
+if __name__ == "__main__":
+    main()
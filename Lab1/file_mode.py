@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import argparse
+import mmap
+import os
+import sys
+import time
+
+CHUNK_SIZE = 1 << 20
+
+
+def build_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("operation", choices=["encrypt", "decrypt"])
+    parser.add_argument("-i", "--input", default="-", help="input file path ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file path ('-' for stdout)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="bytes processed per chunk")
+    parser.add_argument("--mmap", action="store_true", help="memory-map the input file instead of reading it")
+    return parser
+
+
+def stream_chunks(transform, source, target, chunk_size=CHUNK_SIZE):
+    total = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        target.write(transform(chunk))
+        total += len(chunk)
+    return total
+
+
+def mmap_chunks(transform, path, target, chunk_size=CHUNK_SIZE):
+    with open(path, "rb") as source:
+        size = os.fstat(source.fileno()).st_size
+        if size == 0:
+            return 0
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, size, chunk_size):
+                target.write(transform(mapped[offset:offset + chunk_size]))
+    return size
+
+
+def run_file_job(transform, args):
+    if args.chunk_size <= 0:
+        print("Chunk size must be a positive number of bytes.", file=sys.stderr)
+        return 2
+    if args.mmap and args.input == "-":
+        print("--mmap requires an input file path, not stdin.", file=sys.stderr)
+        return 2
+
+    target = None
+    start = time.perf_counter()
+    try:
+        if args.mmap:
+            # Opened first so a missing input does not leave an empty output file behind.
+            open(args.input, "rb").close()
+            target = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+            total = mmap_chunks(transform, args.input, target, args.chunk_size)
+        elif args.input == "-":
+            target = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+            total = stream_chunks(transform, sys.stdin.buffer, target, args.chunk_size)
+        else:
+            with open(args.input, "rb") as source:
+                target = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+                total = stream_chunks(transform, source, target, args.chunk_size)
+        target.flush()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if target is not None and target is not sys.stdout.buffer:
+            target.close()
+    elapsed = time.perf_counter() - start
+
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"Processed {total} bytes in {elapsed:.3f} s ({rate / 1e6:.2f} MB/s)", file=sys.stderr)
+    return 0
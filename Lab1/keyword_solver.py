@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+import numpy as np
+
+from Task2 import STANDARD_ALPHABET, decrypt_caesar_2keys, generate_permuted_alphabet, validate_key2
+
+QUADGRAM_SPACE = 26 ** 4
+DICTIONARY_SAMPLE = 2000
+# log10 quadgram probabilities of English prose (about 14 MB of man pages and free-software
+# licence texts), stored as float32; rebuild with --train-quadgrams CORPUS --save-quadgrams PATH.
+QUADGRAM_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "english_quadgrams.npz")
+
+_worker_state = {}
+
+
+def letters_only(text):
+    return re.sub('[^A-Z]', '', text.upper())
+
+
+def text_to_indices(text):
+    return np.frombuffer(letters_only(text).encode('ascii'), dtype=np.uint8).astype(np.int64) - ord('A')
+
+
+def indices_to_text(indices):
+    return (np.asarray(indices, dtype=np.uint8) + ord('A')).tobytes().decode('ascii')
+
+
+def quadgram_indices(indices):
+    return ((indices[:-3] * 26 + indices[1:-2]) * 26 + indices[2:-1]) * 26 + indices[3:]
+
+
+def build_quadgram_table(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum()
+    if total == 0:
+        raise ValueError("Quadgram model is empty.")
+    floor = np.log10(0.01 / total)
+    with np.errstate(divide='ignore'):
+        table = np.log10(counts / total)
+    table[counts == 0] = floor
+    return table
+
+
+def train_quadgrams(text):
+    indices = text_to_indices(text)
+    return build_quadgram_table(np.bincount(quadgram_indices(indices), minlength=QUADGRAM_SPACE))
+
+
+def load_quadgram_file(path):
+    counts = np.zeros(QUADGRAM_SPACE, dtype=np.float64)
+    with open(path, encoding='utf-8') as source:
+        for line in source:
+            parts = line.split()
+            if len(parts) != 2 or len(parts[0]) != 4 or not parts[0].isalpha():
+                continue
+            counts[quadgram_indices(text_to_indices(parts[0]))[0]] += float(parts[1])
+    return build_quadgram_table(counts)
+
+
+def load_quadgram_table(path):
+    with np.load(path) as stored:
+        table = stored["table"].astype(np.float64)
+    if table.shape != (QUADGRAM_SPACE,):
+        raise ValueError(f"'{path}' does not hold a quadgram table.")
+    return table
+
+
+def save_quadgram_table(table, path):
+    np.savez_compressed(path, table=np.asarray(table, dtype=np.float32))
+
+
+@lru_cache(maxsize=1)
+def default_quadgram_table():
+    return load_quadgram_table(QUADGRAM_FILE)
+
+
+def score_indices(indices, table):
+    return float(table[quadgram_indices(indices)].sum())
+
+
+def hill_climb(cipher, table, seed=None, max_stale_passes=1):
+    rng = np.random.default_rng(seed)
+    windows = np.stack([cipher[i:len(cipher) - 3 + i] for i in range(4)], axis=1)
+    contains = np.zeros((len(windows), 26), dtype=bool)
+    for column in range(4):
+        contains[np.arange(len(windows)), windows[:, column]] = True
+    # Windows that contain each cipher letter; a swap only rescores the windows of its two letters.
+    letter_windows = [np.flatnonzero(contains[:, letter]) for letter in range(26)]
+    pairs = [(a, b) for a in range(26) for b in range(a + 1, 26)]
+
+    key = rng.permutation(26)
+    quads = quadgram_indices(key[cipher])
+    values = table[quads]
+    score = float(values.sum())
+
+    stale = 0
+    while stale < max_stale_passes:
+        improved = False
+        for pair_index in rng.permutation(len(pairs)):
+            a, b = pairs[pair_index]
+            # Union without sorting: windows of a, then the windows of b that do not contain a.
+            b_windows = letter_windows[b]
+            affected = np.concatenate((letter_windows[a], b_windows[~contains[b_windows, a]]))
+            if len(affected) == 0:
+                continue
+            key[a], key[b] = key[b], key[a]
+            plain = key[windows[affected]]
+            new_quads = ((plain[:, 0] * 26 + plain[:, 1]) * 26 + plain[:, 2]) * 26 + plain[:, 3]
+            new_values = table[new_quads]
+            delta = float(new_values.sum() - values[affected].sum())
+            if delta > 0:
+                quads[affected] = new_quads
+                values[affected] = new_values
+                score += delta
+                improved = True
+            else:
+                key[a], key[b] = key[b], key[a]
+        stale = 0 if improved else stale + 1
+
+    return score, key
+
+
+def search_alphabet(forward, backward, key1, prefix, budget):
+    alphabet = [None] * 26
+    used = [False] * 26
+    order = list(range(prefix, 26)) + list(range(prefix))
+    nodes = 0
+
+    def fits(position, letter):
+        if used[letter]:
+            return False
+        if position >= prefix:
+            for i in range(position - 1, prefix - 1, -1):
+                if alphabet[i] is not None:
+                    if alphabet[i] > letter:
+                        return False
+                    break
+            for i in range(position + 1, 26):
+                if alphabet[i] is not None:
+                    if alphabet[i] < letter:
+                        return False
+                    break
+        return True
+
+    def place(position, letter, trail):
+        pending = [(position, letter)]
+        while pending:
+            position, letter = pending.pop()
+            if alphabet[position] is not None:
+                if alphabet[position] != letter:
+                    return False
+                continue
+            if not fits(position, letter):
+                return False
+            alphabet[position] = letter
+            used[letter] = True
+            trail.append(position)
+            if letter in forward:
+                pending.append(((position + key1) % 26, forward[letter]))
+            if letter in backward:
+                pending.append(((position - key1) % 26, backward[letter]))
+        return True
+
+    def undo(trail):
+        for position in trail:
+            used[alphabet[position]] = False
+            alphabet[position] = None
+
+    def fill(index):
+        nonlocal nodes
+        while index < 26 and alphabet[order[index]] is not None:
+            index += 1
+        if index == 26:
+            return True
+        nodes += 1
+        if nodes > budget:
+            return False
+        for letter in range(26):
+            if used[letter]:
+                continue
+            trail = []
+            if place(order[index], letter, trail) and fill(index + 1):
+                return True
+            undo(trail)
+        return False
+
+    return alphabet if fill(0) else None
+
+
+def recover_keys(decrypt_key, cipher_letters=range(26), budget=2000):
+    backward = {int(c): int(decrypt_key[c]) for c in cipher_letters}
+    forward = {p: c for c, p in backward.items()}
+    for prefix in range(1, 26):
+        for key1 in range(1, 26):
+            alphabet = search_alphabet(forward, backward, key1, prefix, budget)
+            if alphabet is not None:
+                permuted = ''.join(STANDARD_ALPHABET[i] for i in alphabet)
+                return key1, permuted[:prefix], permuted
+    return None
+
+
+def _init_worker(cipher, table):
+    _worker_state['cipher'] = cipher
+    _worker_state['table'] = table
+
+
+def _climb_task(seed, max_stale_passes):
+    score, key = hill_climb(_worker_state['cipher'], _worker_state['table'], seed, max_stale_passes)
+    return score, key, time.perf_counter()
+
+
+def solve_hill_climb(ciphertext, table=None, restarts=16, workers=None, seed=None, max_stale_passes=1):
+    table = default_quadgram_table() if table is None else table
+    cipher = text_to_indices(ciphertext)
+    if len(cipher) < 4:
+        raise ValueError("Ciphertext needs at least 4 letters.")
+    seeds = np.random.SeedSequence(seed).spawn(restarts)
+
+    start = time.perf_counter()
+    best = None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cipher, table)) as pool:
+        futures = [pool.submit(_climb_task, s, max_stale_passes) for s in seeds]
+        for future in as_completed(futures):
+            score, key, finished = future.result()
+            if best is None or score > best[0]:
+                best = (score, key, finished - start)
+    total = time.perf_counter() - start
+
+    score, key, time_to_solution = best
+    return {
+        'score': score,
+        'plaintext': indices_to_text(key[cipher]),
+        'keys': recover_keys(key, np.unique(cipher).tolist()),
+        'time_to_solution': time_to_solution,
+        'total_time': total,
+    }
+
+
+def solve_dictionary(ciphertext, words, table=None, sample=DICTIONARY_SAMPLE):
+    table = default_quadgram_table() if table is None else table
+    cipher = text_to_indices(ciphertext)[:sample]
+    if len(cipher) < 4:
+        raise ValueError("Ciphertext needs at least 4 letters.")
+    shifts = np.arange(1, 26)[:, None]
+
+    start = time.perf_counter()
+    best = None
+    seen = set()
+    for word in words:
+        word = word.strip()
+        if not validate_key2(word):
+            continue
+        permuted = generate_permuted_alphabet(word)
+        if permuted in seen:
+            continue
+        seen.add(permuted)
+        alphabet = np.frombuffer(permuted.encode('ascii'), dtype=np.uint8).astype(np.int64) - ord('A')
+        inverse = np.argsort(alphabet)
+        plain = alphabet[(inverse[cipher][None, :] - shifts) % 26]
+        quads = ((plain[:, :-3] * 26 + plain[:, 1:-2]) * 26 + plain[:, 2:-1]) * 26 + plain[:, 3:]
+        scores = table[quads].sum(axis=1)
+        index = int(np.argmax(scores))
+        if best is None or scores[index] > best[0]:
+            best = (float(scores[index]), index + 1, word, permuted, time.perf_counter() - start)
+    if best is None:
+        return None
+
+    score, key1, word, permuted, time_to_solution = best
+    return {
+        'score': score,
+        'plaintext': decrypt_caesar_2keys(letters_only(ciphertext), key1, permuted),
+        'keys': (key1, word.upper(), permuted),
+        'time_to_solution': time_to_solution,
+        'total_time': time.perf_counter() - start,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keyword recovery for the Caesar cipher with permutation")
+    parser.add_argument("-i", "--input", default="-", help="ciphertext file ('-' for stdin)")
+    parser.add_argument("--quadgrams", help="quadgram counts file ('TION 13168375' per line) or a saved .npz table")
+    parser.add_argument("--train-quadgrams", metavar="CORPUS", help="build the quadgram table from an English text file")
+    parser.add_argument("--save-quadgrams", metavar="PATH", help="save the quadgram table in use as .npz and exit")
+    parser.add_argument("--dictionary", help="word list to try as key 2 instead of hill climbing")
+    parser.add_argument("--restarts", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.train_quadgrams:
+        with open(args.train_quadgrams, encoding='utf-8', errors='ignore') as corpus:
+            table = train_quadgrams(corpus.read())
+    elif args.quadgrams:
+        load = load_quadgram_table if args.quadgrams.endswith('.npz') else load_quadgram_file
+        table = load(args.quadgrams)
+    else:
+        table = default_quadgram_table()
+    if args.save_quadgrams:
+        save_quadgram_table(table, args.save_quadgrams)
+        return
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding='utf-8')
+    with source:
+        ciphertext = source.read()
+
+    if args.dictionary:
+        with open(args.dictionary, encoding='utf-8') as words:
+            result = solve_dictionary(ciphertext, words, table)
+        if result is None:
+            print("No valid keyword (min 7 letters) found in the dictionary.")
+            return
+    else:
+        result = solve_hill_climb(ciphertext, table, args.restarts, args.workers, args.seed)
+
+    print("=" * 60)
+    print(f"Score: {result['score']:.2f}")
+    if result['keys'] is None:
+        print("Substitution found, but it does not match any (k1, k2) pair.")
+    else:
+        key1, keyword, permuted = result['keys']
+        print(f"Recovered keys: Caesar Shift (k1)={key1}, Keyword (k2)='{keyword}'")
+        print(f"Permuted Alphabet: {permuted}")
+    print(f"Plaintext: {result['plaintext']}")
+    print(f"Time to solution: {result['time_to_solution']:.3f} s (total {result['total_time']:.3f} s)")
+
+
+if __name__ == "__main__":
+    main()
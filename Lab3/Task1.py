@@ -1,5 +1,18 @@
 #!/usr/bin/env python3
 
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alphabet import ROMANIAN
+
+ALPHABET = ROMANIAN.letters
+ALPHABET_SIZE = ROMANIAN.size
+
+
 def validate_key(key):
     if len(key) < 7:
         return False
@@ -11,10 +24,7 @@ def validate_key(key):
 
 
 def validate_text(text):
-    for char in text:
-        if not char.isalpha():
-            return False
-    return True
+    return ROMANIAN.validate(text)
 
 
 def preprocess_text(text):
@@ -22,54 +32,59 @@ def preprocess_text(text):
 
 
 def letter_to_number(letter):
-
-
-    alphabet = "AĂÂBCDEFGHIÎJKLMNOPQRSTȘȚUVWXYZ"
-    return alphabet.index(letter)
+    return ROMANIAN.number(letter)
 
 
 def number_to_letter(number):
-
-    alphabet = "AĂÂBCDEFGHIÎJKLMNOPQRSTȘȚUVWXYZ"
-    return alphabet[number % 31]
+    return ROMANIAN.letter(number)
 
 
-def encrypt_vigenere(plaintext, key):
-    ciphertext = ""
-    key_upper = key.upper()
+def text_to_indices(text):
+    return ROMANIAN.to_indices(text)
 
-    for i, char in enumerate(plaintext):
-        if char.isalpha():
 
-            key_char = key_upper[i % len(key_upper)]
-            key_value = letter_to_number(key_char)
+def indices_to_text(indices):
+    return ROMANIAN.from_indices(indices)
 
 
-            letter_num = letter_to_number(char)
+def key_to_indices(key):
+    key_indices, _ = text_to_indices(key)
+    if len(key_indices) == 0 or (key_indices < 0).any():
+        raise ValueError("The key must contain only Romanian letters.")
+    return key_indices
 
-            encrypted_num = (letter_num + key_value) % 31
 
-            ciphertext += number_to_letter(encrypted_num)
-    return ciphertext
+def letter_indices(text):
+    indices, codepoints = text_to_indices(text)
+    letters = indices >= 0
+    if not letters.all():
+        unknown = np.unique(codepoints[~letters]).tolist()
+        if any(chr(codepoint).isalpha() for codepoint in unknown):
+            raise ValueError("Invalid characters. Please enter only Romanian letters (A-Z or a-z).")
+    return indices, letters
 
 
-def decrypt_vigenere(ciphertext, key):
-    plaintext = ""
-    key_upper = key.upper()
+def key_stream(key_indices, length, offset=0):
+    repeats = (offset % len(key_indices) + length) // len(key_indices) + 1
+    start = offset % len(key_indices)
+    return np.tile(key_indices, repeats)[start:start + length]
 
-    for i, char in enumerate(ciphertext):
-        if char.isalpha():
 
-            key_char = key_upper[i % len(key_upper)]
-            key_value = letter_to_number(key_char)
+def vigenere_transform(text, key, direction, offset=0):
+    indices, letters = letter_indices(text)
+    keystream = key_stream(key_to_indices(key), len(indices), offset)
+    if not letters.all():
+        indices, keystream = indices[letters], keystream[letters]
+    result = (indices + direction * keystream) % ALPHABET_SIZE
+    return indices_to_text(result)
 
 
-            letter_num = letter_to_number(char)
+def encrypt_vigenere(plaintext, key, offset=0):
+    return vigenere_transform(plaintext, key, 1, offset)
 
-            decrypted_num = (letter_num - key_value) % 31
 
-            plaintext += number_to_letter(decrypted_num)
-    return plaintext
+def decrypt_vigenere(ciphertext, key, offset=0):
+    return vigenere_transform(ciphertext, key, -1, offset)
 
 
 def get_operation():
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from math import lcm
+
+import numpy as np
+
+from Task1 import ALPHABET, ALPHABET_SIZE, decrypt_vigenere, indices_to_text, text_to_indices
+
+# Approximate letter frequencies (%) of Romanian text, in ALPHABET order.
+ROMANIAN_FREQUENCIES = np.array([
+    9.95, 4.06, 1.10, 1.07, 5.28, 3.45, 11.47, 1.18, 0.99, 0.47, 9.99, 1.00, 0.24, 0.11, 4.48, 3.10,
+    6.47, 4.86, 3.03, 0.01, 6.82, 4.40, 6.04, 1.55, 1.00, 6.20, 1.23, 0.03, 0.11, 0.07, 0.71
+])
+ROMANIAN_FREQUENCIES = ROMANIAN_FREQUENCIES / ROMANIAN_FREQUENCIES.sum()
+ROMANIAN_IOC = float((ROMANIAN_FREQUENCIES ** 2).sum())
+RANDOM_IOC = 1.0 / ALPHABET_SIZE
+
+MAX_KEY_LENGTH = 40
+KASISKI_NGRAM = 3
+KASISKI_MAX_DISTANCES = 200000
+# Kasiski only filters the IoC candidates once there are KASISKI_MIN_DISTANCES repeats; see
+# kasiski_filter for the other two.
+KASISKI_MIN_DISTANCES = 8
+KASISKI_SIGMAS = 2.0
+KASISKI_SHARE = 0.75
+MAX_FOLD_PERIOD = 1 << 12
+
+# SHIFT_LOG_MATRIX[c, k] is log P(plain letter) for ciphertext letter c under key letter k.
+SHIFT_LOG_MATRIX = np.log(np.maximum(ROMANIAN_FREQUENCIES, 1e-6))[
+    (np.arange(ALPHABET_SIZE)[:, None] - np.arange(ALPHABET_SIZE)[None, :]) % ALPHABET_SIZE
+]
+
+
+def ciphertext_indices(ciphertext):
+    indices, _ = text_to_indices(ciphertext)
+    return indices[indices >= 0].astype(np.int64)
+
+
+def kasiski_distances(indices, ngram=KASISKI_NGRAM, limit=KASISKI_MAX_DISTANCES):
+    if len(indices) < 2 * ngram:
+        return np.zeros(0, dtype=np.int64)
+    codes = np.zeros(len(indices) - ngram + 1, dtype=np.int64)
+    for offset in range(ngram):
+        codes = codes * ALPHABET_SIZE + indices[offset:len(indices) - ngram + 1 + offset]
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    repeated = sorted_codes[1:] == sorted_codes[:-1]
+    distances = (order[1:] - order[:-1])[repeated]
+    return distances[:limit]
+
+
+def kasiski_hits(distances, lengths):
+    lengths = np.asarray(lengths)
+    return (distances[None, :] % lengths[:, None] == 0).sum(axis=1)
+
+
+def kasiski_scores(distances, lengths):
+    lengths = np.asarray(lengths)
+    if len(distances) == 0:
+        return np.zeros(len(lengths))
+    # Every distance is a multiple of 1, so weight longer periods by their length.
+    return kasiski_hits(distances, lengths) * lengths / len(distances)
+
+
+def column_histograms(indices, length):
+    columns = np.arange(len(indices)) % length
+    return np.bincount(columns * ALPHABET_SIZE + indices, minlength=length * ALPHABET_SIZE).reshape(length, ALPHABET_SIZE)
+
+
+def index_of_coincidence(histograms):
+    totals = histograms.sum(axis=1)
+    pairs = totals * (totals - 1)
+    coincidences = (histograms * (histograms - 1)).sum(axis=1)
+    return np.divide(coincidences, pairs, out=np.zeros(len(totals)), where=pairs > 0)
+
+
+def fold_groups(lengths, limit=MAX_FOLD_PERIOD):
+    # The column histograms of a length are the folded histograms of any multiple of it, so
+    # lengths are grouped under common multiples and each group costs a single bincount.
+    groups = []
+    for length in sorted(lengths, reverse=True):
+        for group in groups:
+            if lcm(group[0], length) <= limit:
+                group[0] = lcm(group[0], length)
+                group[1].append(length)
+                break
+        else:
+            groups.append([length, [length]])
+    return [(base, members) for base, members in groups]
+
+
+def ioc_for_base(indices, base, lengths):
+    histograms = column_histograms(indices, base)
+    return [float(index_of_coincidence(histograms.reshape(base // length, length, ALPHABET_SIZE).sum(axis=0)).mean())
+            for length in lengths]
+
+
+def ioc_for_lengths(indices, lengths):
+    by_length = {}
+    for base, members in fold_groups(lengths):
+        by_length.update(zip(members, ioc_for_base(indices, base, members)))
+    return [by_length[length] for length in lengths]
+
+
+def kasiski_filter(candidates, distances):
+    # A length unrelated to the key divides one distance in `length` by chance; candidates
+    # that do no better are dropped. A divisor of the key length divides the same distances
+    # as the key length, while the key length divides only one in k of the distances its
+    # k-th multiple divides: a candidate that keeps KASISKI_SHARE of its hits at one of its
+    # multiples is a divisor of the period.
+    hits = dict(zip(candidates, kasiski_hits(distances, candidates).tolist()))
+    backed = [length for length in candidates
+              if hits[length] >= len(distances) / length + KASISKI_SIGMAS * np.sqrt(len(distances) / length)]
+    return [length for length in backed
+            if not any(multiple > length and multiple % length == 0 and hits[multiple] >= KASISKI_SHARE * hits[length]
+                       for multiple in backed)]
+
+
+def estimate_key_length(indices, max_length=MAX_KEY_LENGTH, workers=1):
+    lengths = list(range(1, min(max_length, max(len(indices) // 2, 1)) + 1))
+    if workers == 1 or len(lengths) < 2:
+        iocs = ioc_for_lengths(indices, lengths)
+    else:
+        groups = fold_groups(lengths)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(ioc_for_base, [indices] * len(groups), *zip(*groups)))
+        by_length = {length: ioc for (_, members), part in zip(groups, parts) for length, ioc in zip(members, part)}
+        iocs = [by_length[length] for length in lengths]
+
+    iocs = np.array(iocs)
+    distances = kasiski_distances(indices)
+    kasiski = kasiski_scores(distances, lengths)
+    # Multiples of the true period score as well as the period itself, so take the
+    # shortest length whose IoC is close to the expected Romanian IoC. A divisor of the period
+    # or, on short texts, an unrelated length can pass that test too; when there are enough
+    # repeats, Kasiski vetoes them before the shortest candidate is taken.
+    threshold = RANDOM_IOC + 0.7 * (min(iocs.max(), ROMANIAN_IOC) - RANDOM_IOC)
+    candidates = [length for length, ioc in zip(lengths, iocs) if ioc >= threshold]
+    if len(distances) >= KASISKI_MIN_DISTANCES:
+        candidates = kasiski_filter(candidates, distances) or candidates
+    ranking = sorted(range(len(lengths)), key=lambda i: (-iocs[i], lengths[i]))
+    return min(candidates), [(lengths[i], float(iocs[i]), float(kasiski[i])) for i in ranking]
+
+
+def recover_key(indices, length):
+    histograms = column_histograms(indices, length)
+    scores = histograms @ SHIFT_LOG_MATRIX
+    return indices_to_text(np.argmax(scores, axis=1))
+
+
+def break_vigenere(ciphertext, max_length=MAX_KEY_LENGTH, workers=1):
+    indices = ciphertext_indices(ciphertext)
+    if len(indices) < 2:
+        raise ValueError("Ciphertext is too short to analyse.")
+    length, ranking = estimate_key_length(indices, max_length, workers)
+    key = recover_key(indices, length)
+    return {
+        'key_length': length,
+        'key': key,
+        'ranking': ranking,
+        'plaintext': decrypt_vigenere(indices_to_text(indices), key),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kasiski / index of coincidence attack on the Romanian Vigenère cipher")
+    parser.add_argument("-i", "--input", default="-", help="ciphertext file ('-' for stdin)")
+    parser.add_argument("--max-length", type=int, default=MAX_KEY_LENGTH)
+    parser.add_argument("--workers", type=int, default=1, help="process pool size for key length scoring")
+    parser.add_argument("--show", type=int, default=5, help="number of candidate key lengths to show")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding='utf-8')
+    with source:
+        ciphertext = source.read()
+    result = break_vigenere(ciphertext, args.max_length, args.workers)
+
+    print("=" * 60)
+    print(f"Romanian alphabet ({ALPHABET_SIZE} letters): {ALPHABET}")
+    print(f"Expected IoC: Romanian = {ROMANIAN_IOC:.4f}, random = {RANDOM_IOC:.4f}")
+    print("\nCandidate key lengths (length, IoC, Kasiski score):")
+    for length, ioc, kasiski in result['ranking'][:args.show]:
+        print(f"  {length:3d}  {ioc:.4f}  {kasiski:.3f}")
+    print(f"\nEstimated key length: {result['key_length']}")
+    print(f"Recovered key: '{result['key']}'")
+    print(f"Plaintext: {result['plaintext'][:200]}{'...' if len(result['plaintext']) > 200 else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Task1 import key_to_indices, vigenere_transform
+
+CHUNK_SIZE = 16 << 20
+# A Romanian letter is at most 2 bytes in UTF-8, so no chunk more than doubles.
+MAX_EXPANSION = 2
+
+_attached = {}
+
+
+def _attach(name):
+    if name not in _attached:
+        _attached[name] = shared_memory.SharedMemory(name=name)
+    return _attached[name]
+
+
+def _transform_range(in_name, out_name, start, end, key, direction, offset):
+    source = _attach(in_name).buf
+    target = _attach(out_name).buf
+    text = str(source[start:end], 'utf-8')
+    result = vigenere_transform(text, key, direction, offset).encode('utf-8')
+    out_start = MAX_EXPANSION * start
+    target[out_start:out_start + len(result)] = result
+    del source, target
+    return len(result)
+
+
+def char_start(buffer, position):
+    while position > 0 and buffer[position] & 0xC0 == 0x80:
+        position -= 1
+    return position
+
+
+def split_bounds(buffer, size, pieces):
+    bounds = [0]
+    for i in range(1, pieces):
+        cut = char_start(buffer, size * i // pieces)
+        if cut > bounds[-1]:
+            bounds.append(cut)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def read_full(source, view):
+    total = 0
+    while total < len(view):
+        count = source.readinto(view[total:])
+        if not count:
+            break
+        total += count
+    return total
+
+
+def transform_stream(source, target, key, direction=1, workers=None, chunk_size=CHUNK_SIZE):
+    key_to_indices(key)
+    workers = workers or os.cpu_count() or 1
+    wave = workers * chunk_size
+    in_shm = shared_memory.SharedMemory(create=True, size=wave)
+    out_shm = shared_memory.SharedMemory(create=True, size=MAX_EXPANSION * wave)
+    total_in = 0
+    chars = 0
+    carry = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while True:
+                view = in_shm.buf
+                count = read_full(source, view[carry:])
+                size = carry + count
+                if size == 0:
+                    del view
+                    break
+                # Keep a trailing character that may be cut in half for the next wave.
+                end = size if count < wave - carry else char_start(view, size - 1)
+                if end == 0:
+                    end = size
+
+                data = np.frombuffer(view, dtype=np.uint8, count=end)
+                bounds = split_bounds(view, end, workers)
+                offsets = [chars]
+                for start, stop in bounds:
+                    offsets.append(offsets[-1] + int(np.count_nonzero((data[start:stop] & 0xC0) != 0x80)))
+                del data
+
+                futures = [pool.submit(_transform_range, in_shm.name, out_shm.name, start, stop, key, direction, offset)
+                           for (start, stop), offset in zip(bounds, offsets)]
+                out_view = out_shm.buf
+                for (start, _), future in zip(bounds, futures):
+                    length = future.result()
+                    target.write(out_view[MAX_EXPANSION * start:MAX_EXPANSION * start + length])
+                del out_view
+
+                chars = offsets[-1]
+                total_in += end
+                carry = size - end
+                view[:carry] = view[end:size]
+                del view
+                if count == 0:
+                    break
+    finally:
+        in_shm.close()
+        in_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+    return total_in, chars
+
+
+def encrypt_vigenere_parallel(plaintext, key, workers=None, chunk_size=CHUNK_SIZE):
+    target = io.BytesIO()
+    transform_stream(io.BytesIO(plaintext.encode('utf-8')), target, key, 1, workers, chunk_size)
+    return target.getvalue().decode('utf-8')
+
+
+def decrypt_vigenere_parallel(ciphertext, key, workers=None, chunk_size=CHUNK_SIZE):
+    target = io.BytesIO()
+    transform_stream(io.BytesIO(ciphertext.encode('utf-8')), target, key, -1, workers, chunk_size)
+    return target.getvalue().decode('utf-8')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-core Romanian Vigenère encryption of large files")
+    parser.add_argument("operation", choices=["encrypt", "decrypt"])
+    parser.add_argument("-k", "--key", required=True)
+    parser.add_argument("-i", "--input", required=True, help="UTF-8 input file")
+    parser.add_argument("-o", "--output", required=True, help="output file")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="bytes per worker per wave")
+    args = parser.parse_args(argv)
+
+    direction = 1 if args.operation == "encrypt" else -1
+    start = time.perf_counter()
+    try:
+        with open(args.input, "rb") as source, open(args.output, "wb") as target:
+            total, chars = transform_stream(source, target, args.key, direction, args.workers, args.chunk_size)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"Processed {total} bytes ({chars} characters) in {elapsed:.3f} s ({rate / 1e6:.2f} MB/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 
+import argparse
 import random
+import sys
+import time
+
+import numpy as np
 
 
 
@@ -77,6 +82,19 @@ S_BOXES = [
 ]
 
 
+# S_BOX_TABLES[j][b] = S_{j+1}(b) indexed directly by the raw 6-bit value b:
+# row = first and last bit, column = middle 4 bits.
+S_BOX_TABLES = [
+    [s_box[((b >> 4) & 0b10) | (b & 1)][(b >> 1) & 0xF] for b in range(64)]
+    for s_box in S_BOXES
+]
+S_BOX_ARRAY = np.array(S_BOX_TABLES, dtype=np.uint8)
+BATCH_SIZE = 1 << 20
+WRITE_BUFFER = 1 << 20
+# Binary batch output: the input value, the eight S-box outputs and the combined word, little-endian.
+BATCH_RECORD = np.dtype([('input', '<u8'), ('outputs', 'u1', (8,)), ('combined', '<u4')])
+
+
 def display_e_table():
     print("\n" + "=" * 60)
     print("Expansion Permutation Table E (32 bits -> 48 bits)")
@@ -175,19 +193,40 @@ def split_48_bits(bits_48):
     return blocks
 
 
-def apply_s_box(block_6bits, s_box_num):
+def split_48_int(value):
+    return [(value >> (42 - 6 * i)) & 0x3F for i in range(8)]
 
-    row_bits = block_6bits[0] + block_6bits[5]
-    row = int(row_bits, 2)
 
+def apply_s_box_int(six_bits, s_box_num):
+    return S_BOX_TABLES[s_box_num - 1][six_bits]
 
-    col_bits = block_6bits[1:5]
-    col = int(col_bits, 2)
 
+def s_box_layer_int(value):
+    result = 0
+    for i, block in enumerate(split_48_int(value)):
+        result = (result << 4) | S_BOX_TABLES[i][block]
+    return result
+
+
+def s_box_layer_batch(values, batch_size=BATCH_SIZE):
+    values = np.asarray(values, dtype=np.uint64).ravel()
+    outputs = np.empty((len(values), 8), dtype=np.uint8)
+    combined = np.zeros(len(values), dtype=np.uint32)
+    for start in range(0, len(values), batch_size):
+        chunk = values[start:start + batch_size]
+        for i in range(8):
+            blocks = ((chunk >> np.uint64(42 - 6 * i)) & np.uint64(0x3F)).astype(np.uint8)
+            out = S_BOX_ARRAY[i][blocks]
+            outputs[start:start + len(chunk), i] = out
+            combined[start:start + len(chunk)] |= out.astype(np.uint32) << np.uint32(28 - 4 * i)
+    return outputs, combined
 
-    s_box = S_BOXES[s_box_num - 1]
-    value = s_box[row][col]
 
+def apply_s_box(block_6bits, s_box_num):
+    six_bits = int(block_6bits, 2)
+    row = ((six_bits >> 4) & 0b10) | (six_bits & 1)
+    col = (six_bits >> 1) & 0xF
+    value = apply_s_box_int(six_bits, s_box_num)
     return row, col, value, binary_string(value, 4)
 
 
@@ -274,14 +313,107 @@ def solve_problem_2_9():
     print("\n" + "=" * 70)
     print("BONUS: All S-box outputs")
     print("=" * 70)
-    all_outputs = []
-    for i in range(8):
-        _, _, val, out = apply_s_box(blocks[i], i + 1)
-        all_outputs.append(out)
-        print(f"S{i+1}(B{i+1}) = {out} (decimal: {val})")
+    value_48 = int(bits_48, 2)
+    for i, block in enumerate(split_48_int(value_48)):
+        val = apply_s_box_int(block, i + 1)
+        print(f"S{i+1}(B{i+1}) = {binary_string(val, 4)} (decimal: {val})")
+
+    combined = s_box_layer_int(value_48)
+    print(f"\nCombined 32-bit output: {binary_string(combined, 32)}")
+    print(f"Hex: 0x{hex_string(combined, 8)}")
+
+
+HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
+def parse_48_bits(text):
+    # 0x-prefixed hexadecimal (at most 12 digits), exactly 12 bare hexadecimal digits or exactly
+    # 48 binary digits, so a truncated line is rejected instead of zero-padded. The lengths keep
+    # the forms apart: a 12-digit line of 0s and 1s is hex, a 48-digit line is never hex.
+    text = text.strip()
+    if text[:2] in ('0x', '0X'):
+        digits = text[2:]
+        if not 1 <= len(digits) <= 12 or not HEX_DIGITS.issuperset(digits):
+            raise ValueError(f"'{text}' is not 1-12 hexadecimal digits")
+        return int(digits, 16)
+    if len(text) == 12 and HEX_DIGITS.issuperset(text):
+        return int(text, 16)
+    if len(text) != 48 or not set(text) <= {'0', '1'}:
+        raise ValueError(f"'{text}' is not 48 binary digits or 12 hexadecimal digits")
+    return int(text, 2)
+
+
+def read_48_bit_batches(source, batch_size=BATCH_SIZE):
+    values = []
+    for number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        try:
+            values.append(parse_48_bits(line))
+        except ValueError:
+            raise ValueError(f"Line {number}: invalid 48-bit value '{line.strip()}'") from None
+        if len(values) == batch_size:
+            yield np.array(values, dtype=np.uint64)
+            values = []
+    if values:
+        yield np.array(values, dtype=np.uint64)
+
+
+CSV_ROW = "%012X," + "%d," * 8 + "%08X\n"
+
 
-    print(f"\nCombined 32-bit output: {''.join(all_outputs)}")
-    print(f"Hex: 0x{hex_string(int(''.join(all_outputs), 2), 8)}")
+def format_csv_rows(values, outputs, combined):
+    # One %-format call per batch instead of one f-string per row.
+    columns = np.column_stack([values, outputs.astype(np.uint64), combined.astype(np.uint64)])
+    return (CSV_ROW * len(values)) % tuple(columns.ravel().tolist())
+
+
+def solve_problem_2_9_batch(source, target, output_format='csv', batch_size=BATCH_SIZE):
+    # Non-interactive problem 2.9: every S_j(B_j) and the combined word for each input line.
+    total = 0
+    if output_format == 'csv':
+        target.write("input," + ",".join(f"S{j}" for j in range(1, 9)) + ",combined\n")
+    for values in read_48_bit_batches(source, batch_size):
+        outputs, combined = s_box_layer_batch(values, batch_size)
+        if output_format == 'csv':
+            target.write(format_csv_rows(values, outputs, combined))
+        else:
+            records = np.empty(len(values), dtype=BATCH_RECORD)
+            records['input'] = values
+            records['outputs'] = outputs
+            records['combined'] = combined
+            target.write(records.tobytes())
+        total += len(values)
+    return total
+
+
+def run_batch_cli(argv):
+    parser = argparse.ArgumentParser(description="DES Problem 2.9 - batch S-box evaluation of 48-bit values")
+    parser.add_argument("input", help="file with one 48-bit value per line: 48 binary digits, 12 hex digits or 0x-hex ('-' for stdin)")
+    parser.add_argument("-o", "--output", required=True, help="output file")
+    parser.add_argument("--format", choices=["csv", "binary"], default="csv",
+                        help=f"csv rows or {BATCH_RECORD.itemsize}-byte binary records")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="values evaluated at once")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    mode, encoding = ("w", "utf-8") if args.format == "csv" else ("wb", None)
+    source = None
+    try:
+        source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        with open(args.output, mode, buffering=WRITE_BUFFER, encoding=encoding) as target:
+            total = solve_problem_2_9_batch(source, target, args.format, args.batch_size)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if source not in (None, sys.stdin):
+            source.close()
+    elapsed = time.perf_counter() - start
+
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"Processed {total} values in {elapsed:.3f} s ({rate:,.0f} values/s)", file=sys.stderr)
+    return 0
 
 
 def main():
@@ -305,5 +437,7 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_batch_cli(sys.argv[1:]))
     main()
 
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Task1 import S_BOX_ARRAY
+from des import E, FP, IP, KEY_SHIFTS, PC1, PC2, SP_TABLES
+
+LAYERS = ("sbox", "feistel", "rounds", "des")
+CHUNK_SIZE = 1 << 16
+
+E_ARRAYS = [np.array(table, dtype=np.uint64) for table in E]
+IP_ARRAYS = [np.array(table, dtype=np.uint64) for table in IP]
+FP_ARRAYS = [np.array(table, dtype=np.uint64) for table in FP]
+PC1_ARRAYS = [np.array(table, dtype=np.uint64) for table in PC1]
+PC2_ARRAYS = [np.array(table, dtype=np.uint64) for table in PC2]
+S_ARRAYS = S_BOX_ARRAY.astype(np.uint64)
+SP_ARRAYS = np.array(SP_TABLES, dtype=np.uint64)
+
+MASK_6 = np.uint64(0x3F)
+MASK_28 = np.uint64(0xFFFFFFF)
+MASK_32 = np.uint64(0xFFFFFFFF)
+
+
+def permute_array(values, tables):
+    # Vector form of des.apply_permutation: one 256-entry lookup per input byte.
+    result = np.zeros_like(values)
+    shift = 8 * (len(tables) - 1)
+    for table in tables:
+        result |= table[(values >> np.uint64(shift)) & np.uint64(0xFF)]
+        shift -= 8
+    return result
+
+
+def s_box_layer_array(x):
+    result = np.zeros_like(x)
+    for j in range(8):
+        result |= S_ARRAYS[j][(x >> np.uint64(42 - 6 * j)) & MASK_6] << np.uint64(28 - 4 * j)
+    return result
+
+
+def feistel_array(r, k):
+    x = permute_array(r, E_ARRAYS) ^ k
+    result = np.zeros_like(x)
+    for j in range(8):
+        result |= SP_ARRAYS[j][(x >> np.uint64(42 - 6 * j)) & MASK_6]
+    return result
+
+
+def rounds_array(block, subkeys):
+    l, r = block >> np.uint64(32), block & MASK_32
+    for k in subkeys:
+        l, r = r, l ^ feistel_array(r, k)
+    return (l << np.uint64(32)) | r
+
+
+def key_schedule_array(keys):
+    cd = permute_array(keys, PC1_ARRAYS)
+    c, d = cd >> np.uint64(28), cd & MASK_28
+    subkeys = []
+    for shift in KEY_SHIFTS:
+        c = ((c << np.uint64(shift)) | (c >> np.uint64(28 - shift))) & MASK_28
+        d = ((d << np.uint64(shift)) | (d >> np.uint64(28 - shift))) & MASK_28
+        subkeys.append(permute_array((c << np.uint64(28)) | d, PC2_ARRAYS))
+    return subkeys
+
+
+def des_array(blocks, subkeys):
+    x = rounds_array(permute_array(blocks, IP_ARRAYS), subkeys)
+    # The last round does not swap: undo the swap made by rounds_array before FP.
+    x = (x << np.uint64(32)) | (x >> np.uint64(32))
+    return permute_array(x, FP_ARRAYS)
+
+
+def layer_bits(layer):
+    return {"sbox": (48, 32), "feistel": (32, 32), "rounds": (64, 64), "des": (64, 64)}[layer]
+
+
+def random_words(rng, bits, count):
+    return rng.integers(0, np.iinfo(np.uint64).max, size=count, dtype=np.uint64, endpoint=True) >> np.uint64(64 - bits)
+
+
+def make_layer(layer, rng, count, rounds):
+    # Returns the function under test with fresh random keys bound for this chunk.
+    if layer == "sbox":
+        return s_box_layer_array
+    if layer == "feistel":
+        key = random_words(rng, 48, count)
+        return lambda r: feistel_array(r, key)
+    if layer == "rounds":
+        subkeys = [random_words(rng, 48, count) for _ in range(rounds)]
+        return lambda block: rounds_array(block, subkeys)
+    subkeys = key_schedule_array(random_words(rng, 64, count))
+    return lambda block: des_array(block, subkeys)
+
+
+def bit_counts(values, bits):
+    # Number of samples with each output bit set, most significant bit first.
+    width = 4 if bits <= 32 else 8
+    columns = np.unpackbits(values.astype(f'>u{width}').view(np.uint8).reshape(-1, width), axis=1)
+    return columns[:, 8 * width - bits:].sum(axis=0, dtype=np.int64)
+
+
+def count_flips(layer, samples, seed, rounds=1):
+    rng = np.random.default_rng(seed)
+    in_bits, out_bits = layer_bits(layer)
+    function = make_layer(layer, rng, samples, rounds)
+    x = random_words(rng, in_bits, samples)
+    base = function(x)
+    counts = np.zeros((in_bits, out_bits), dtype=np.int64)
+    for i in range(in_bits):
+        counts[i] = bit_counts(base ^ function(x ^ np.uint64(1 << (in_bits - 1 - i))), out_bits)
+    return counts
+
+
+def flip_matrix(layer, samples, rounds=1, workers=None, chunk_size=CHUNK_SIZE, seed=None):
+    # matrix[i, j] is the probability that output bit j changes when input bit i is flipped.
+    if layer not in LAYERS:
+        raise ValueError(f"Unknown layer '{layer}'. Choose one of: {', '.join(LAYERS)}.")
+    workers = workers or os.cpu_count() or 1
+    sizes = [min(chunk_size, samples - start) for start in range(0, samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    counts = np.zeros(layer_bits(layer), dtype=np.int64)
+    if workers == 1:
+        for size, chunk_seed in zip(sizes, seeds):
+            counts += count_flips(layer, size, chunk_seed, rounds)
+        return counts / samples
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for size, chunk_seed in zip(sizes, seeds):
+            pending.append(pool.submit(count_flips, layer, size, chunk_seed, rounds))
+            if len(pending) >= 2 * workers:
+                counts += pending.popleft().result()
+        while pending:
+            counts += pending.popleft().result()
+    return counts / samples
+
+
+def summarize(matrix):
+    deviation = np.abs(matrix - 0.5)
+    return {
+        "mean": float(matrix.mean()),
+        "min": float(matrix.min()),
+        "max": float(matrix.max()),
+        "max_deviation": float(deviation.max()),
+        "output_bits_flipped": float(matrix.sum(axis=1).mean()),
+        "independent_pairs": int(np.count_nonzero(matrix == 0)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Avalanche statistics of the DES round function")
+    parser.add_argument("layer", choices=LAYERS,
+                        help="sbox: S-box layer on 48 bits; feistel: S(E(R) ^ K) through P; "
+                             "rounds: Feistel rounds with random subkeys; des: full DES with random keys")
+    parser.add_argument("-n", "--samples", type=int, default=1_000_000, help="random inputs to test")
+    parser.add_argument("--rounds", type=int, default=1, help="rounds for the 'rounds' layer")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="samples per task")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--matrix", action="store_true", help="print the flip probability matrix")
+    parser.add_argument("-o", "--output", help="save the matrix to a .npy file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        matrix = flip_matrix(args.layer, args.samples, args.rounds, args.workers, args.chunk_size, args.seed)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+
+    in_bits, out_bits = matrix.shape
+    print(f"{args.layer}: {in_bits} input bits x {out_bits} output bits, {args.samples:,} samples")
+    for name, value in summarize(matrix).items():
+        print(f"  {name}: {value:.4f}" if isinstance(value, float) else f"  {name}: {value}")
+    if args.matrix:
+        for i, row in enumerate(matrix):
+            print(f"{i + 1:2d} " + " ".join(f"{p * 100:3.0f}" for p in row))
+    if args.output:
+        np.save(args.output, matrix)
+    rate = args.samples * (in_bits + 1) / elapsed if elapsed > 0 else float("inf")
+    print(f"Done in {elapsed:.2f} s ({rate / 1e6:.1f}M evaluations/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+import time
+
+import numpy as np
+
+from Task1 import E_TABLE, S_BOX_TABLES
+from des import DES, FP_TABLE, IP_TABLE, KEY_SHIFTS, P_TABLE, PC1_TABLE, PC2_TABLE
+
+LANES = 64
+WORD_MASK = (1 << LANES) - 1
+ARRAY_ONES = np.uint64(WORD_MASK)
+
+
+def algebraic_normal_form(truth_table):
+    # Moebius transform: coefficient m is the XOR of f(x) over every x whose bits are a subset of m.
+    coefficients = list(truth_table)
+    step = 1
+    while step < len(coefficients):
+        for i in range(len(coefficients)):
+            if i & step:
+                coefficients[i] ^= coefficients[i ^ step]
+        step <<= 1
+    return coefficients
+
+
+class GateNetwork:
+    __slots__ = ('name', 'inputs', 'gates', 'outputs', 'source', 'function')
+
+    def __init__(self, name, inputs, gates, outputs):
+        self.name = name
+        self.inputs = inputs
+        self.gates = gates
+        self.outputs = outputs
+        self.source = self._generate_source()
+        namespace = {}
+        exec(compile(self.source, f"<gate network {name}>", "exec"), namespace)
+        self.function = namespace[name]
+
+    def __repr__(self):
+        return f"GateNetwork({self.name}, inputs={self.inputs}, gates={len(self.gates)})"
+
+    def __call__(self, *args):
+        return self.function(*args)
+
+    def _wire(self, wire):
+        return f"x{wire}" if wire < self.inputs else f"t{wire}"
+
+    def _generate_source(self):
+        args = ", ".join(f"x{i}" for i in range(self.inputs))
+        lines = [f"def {self.name}({args}, ones):"]
+        for number, (op, a, b) in enumerate(self.gates, self.inputs):
+            if op == "and":
+                expression = f"{self._wire(a)} & {self._wire(b)}"
+            elif op == "xor":
+                expression = f"{self._wire(a)} ^ {self._wire(b)}"
+            else:
+                expression = f"{self._wire(a)} ^ ones"
+            lines.append(f"    t{number} = {expression}")
+        lines.append(f"    return {', '.join(self._wire(wire) for wire in self.outputs)},")
+        return "\n".join(lines) + "\n"
+
+
+def build_network(name, table, in_bits, out_bits):
+    # Input x0 is the most significant table index bit, output 0 the most significant value bit.
+    gates = []
+    monomials = {1 << (in_bits - 1 - i): i for i in range(in_bits)}
+
+    def add(op, a, b=None):
+        gates.append((op, a, b))
+        return in_bits + len(gates) - 1
+
+    def monomial(mask):
+        if mask not in monomials:
+            low = mask & -mask
+            monomials[mask] = add("and", monomial(mask ^ low), monomials[low])
+        return monomials[mask]
+
+    outputs = []
+    for bit in range(out_bits):
+        shift = out_bits - 1 - bit
+        coefficients = algebraic_normal_form([(value >> shift) & 1 for value in table])
+        terms = [monomial(mask) for mask in range(1, len(table)) if coefficients[mask]]
+        wire = terms[0] if terms else add("xor", 0, 0)
+        for term in terms[1:]:
+            wire = add("xor", wire, term)
+        if coefficients[0]:
+            wire = add("not", wire)
+        outputs.append(wire)
+    return GateNetwork(name, in_bits, gates, outputs)
+
+
+def s_box_networks():
+    return [build_network(f"s_box_{i + 1}", table, 6, 4) for i, table in enumerate(S_BOX_TABLES)]
+
+
+S_BOX_NETWORKS = s_box_networks()
+
+
+def round_key_bits():
+    # ROUND_KEY_BITS[r][i] is the key bit (1-based, DES numbering) that lands in bit i of subkey r.
+    c, d = PC1_TABLE[:28], PC1_TABLE[28:]
+    rounds = []
+    for shift in KEY_SHIFTS:
+        c = c[shift:] + c[:shift]
+        d = d[shift:] + d[:shift]
+        cd = c + d
+        rounds.append([cd[position - 1] for position in PC2_TABLE])
+    return rounds
+
+
+ROUND_KEY_BITS = round_key_bits()
+
+
+def pack_lanes(values, bits):
+    # Slice i holds bit i (DES numbering from the most significant end) of every value, value j in lane j.
+    if len(values) > LANES:
+        raise ValueError(f"At most {LANES} values fit in one set of word slices.")
+    slices = []
+    for i in range(bits):
+        shift = bits - 1 - i
+        word = 0
+        for lane, value in enumerate(values):
+            word |= ((value >> shift) & 1) << lane
+        slices.append(word)
+    return slices
+
+
+def unpack_lanes(slices, count=LANES):
+    bits = len(slices)
+    values = [0] * count
+    for i, word in enumerate(slices):
+        shift = bits - 1 - i
+        for lane in range(count):
+            values[lane] |= ((word >> lane) & 1) << shift
+    return values
+
+
+def pack_array(values, bits):
+    # Same layout as pack_lanes over uint64 arrays: result[i, w] carries values 64w..64w+63.
+    values = np.asarray(values, dtype=np.uint64).ravel()
+    padded = np.zeros(-(-len(values) // LANES) * LANES, dtype=np.uint64)
+    padded[:len(values)] = values
+    shifts = np.arange(bits - 1, -1, -1, dtype=np.uint64)
+    lane_bits = ((padded[:, None] >> shifts[None, :]) & np.uint64(1)).astype(np.uint8)
+    lane_bits = lane_bits.reshape(-1, LANES, bits).transpose(2, 0, 1)
+    packed = np.packbits(lane_bits, axis=2, bitorder='little')
+    return np.ascontiguousarray(packed).view('<u8').reshape(bits, -1)
+
+
+def unpack_array(slices, count=None):
+    slices = np.ascontiguousarray(slices, dtype='<u8')
+    bits = len(slices)
+    lane_bits = np.unpackbits(slices.view(np.uint8).reshape(bits, -1, 8), axis=2, bitorder='little')
+    lane_bits = lane_bits.reshape(bits, -1).T.astype(np.uint64)
+    shifts = np.arange(bits - 1, -1, -1, dtype=np.uint64)
+    values = np.bitwise_or.reduce(lane_bits << shifts[None, :], axis=1)
+    return values if count is None else values[:count]
+
+
+def constant_slices(value, bits, ones=WORD_MASK):
+    # Every lane gets the same value, e.g. one key shared by all blocks.
+    return [ones if (value >> (bits - 1 - i)) & 1 else ones ^ ones for i in range(bits)]
+
+
+def s_box_layer_sliced(x, ones=WORD_MASK):
+    out = []
+    for i, network in enumerate(S_BOX_NETWORKS):
+        out.extend(network.function(*x[6 * i:6 * i + 6], ones))
+    return out
+
+
+def feistel_sliced(r, k, ones=WORD_MASK):
+    x = [r[position - 1] ^ key_bit for position, key_bit in zip(E_TABLE, k)]
+    s = s_box_layer_sliced(x, ones)
+    return [s[position - 1] for position in P_TABLE]
+
+
+def round_keys_sliced(key_slices):
+    return [[key_slices[position - 1] for position in bits] for bits in ROUND_KEY_BITS]
+
+
+def des_rounds_sliced(l, r, round_keys, ones=WORD_MASK):
+    for k in round_keys:
+        f = feistel_sliced(r, k, ones)
+        l, r = r, [a ^ b for a, b in zip(l, f)]
+    return l, r
+
+
+def des_sliced(block_slices, key_slices, decrypt=False, ones=WORD_MASK):
+    # The key is sliced too, so every lane may use its own key; IP, E, P and FP are pure wiring.
+    round_keys = round_keys_sliced(key_slices)
+    if decrypt:
+        round_keys.reverse()
+    x = [block_slices[position - 1] for position in IP_TABLE]
+    l, r = des_rounds_sliced(x[:32], x[32:], round_keys, ones)
+    out = r + l
+    return [out[position - 1] for position in FP_TABLE]
+
+
+def encrypt_array(blocks, key, decrypt=False):
+    blocks = np.asarray(blocks, dtype=np.uint64).ravel()
+    block_slices = list(pack_array(blocks, 64))
+    key_slices = constant_slices(key, 64, ARRAY_ONES)
+    return unpack_array(np.array(des_sliced(block_slices, key_slices, decrypt, ARRAY_ONES)), len(blocks))
+
+
+def verify_networks():
+    # Lane b of input slice i carries bit i of b, so one call evaluates all 64 table entries.
+    inputs = pack_lanes(range(64), 6)
+    for network, table in zip(S_BOX_NETWORKS, S_BOX_TABLES):
+        if unpack_lanes(list(network.function(*inputs, WORD_MASK)), 64) != table:
+            return False
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("Bitsliced DES - S-boxes compiled to gate networks")
+    print("=" * 70)
+    for network in S_BOX_NETWORKS:
+        print(f"{network.name}: {len(network.gates)} gates")
+    print(f"\nGate networks match the S-box tables: {verify_networks()}")
+
+    rng = np.random.default_rng()
+    key = 0x133457799BBCDFF1
+    blocks = rng.integers(0, 1 << 63, size=1 << 16, dtype=np.uint64) * np.uint64(2)
+    start = time.perf_counter()
+    result = encrypt_array(blocks, key)
+    elapsed = time.perf_counter() - start
+    reference = DES(key)
+    matches = all(reference.encrypt_int(int(b)) == int(c) for b, c in zip(blocks[:256], result[:256]))
+    print(f"Matches the table-driven DES: {matches}")
+    print(f"Throughput: {len(blocks) / elapsed:,.0f} blocks/s, "
+          f"{len(blocks) * 16 * 8 / elapsed / 1e6:,.1f}M S-box evaluations/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import bitslice
+from des import FP, IP, apply_permutation, des_rounds, feistel, key_schedule
+
+ENGINES = ("scalar", "bitslice")
+CHUNK_KEYS = 1 << 16
+CHECKPOINT_VERSION = 1
+CHECKPOINT_INTERVAL = 10.0
+# Every eighth key bit is a parity bit that PC-1 drops; only the other 56 change the subkeys.
+EFFECTIVE_KEY_BITS = [position for position in range(1, 65) if position % 8]
+
+
+def key_bit(position):
+    return 1 << (64 - position)
+
+
+def keys_for_indices(base_key, key_bits, indices):
+    # Vector form of KeySearch.key_for_index: bit b of each index selects key_bits[b].
+    indices = np.asarray(indices, dtype=np.uint64)
+    keys = np.full(len(indices), base_key, dtype=np.uint64)
+    for b, bit in enumerate(key_bits):
+        keys |= ((indices >> np.uint64(b)) & np.uint64(1)) * np.uint64(bit)
+    return keys
+
+
+def encrypt_rounds(key, plaintext, rounds=16):
+    # DES reduced to its first `rounds` rounds; 16 gives the full cipher.
+    x = apply_permutation(plaintext, IP)
+    l, r = des_rounds(x >> 32, x & 0xFFFFFFFF, key_schedule(key)[:rounds])
+    return apply_permutation((r << 32) | l, FP)
+
+
+class KeySearch:
+    __slots__ = ('pairs', 'base_key', 'positions', 'rounds', 'key_bits', 'contributions',
+                 'l0', 'r0', 'target_l', 'target_r')
+
+    def __init__(self, pairs, base_key, unknown_bits, rounds=16):
+        if not 1 <= unknown_bits <= len(EFFECTIVE_KEY_BITS):
+            raise ValueError(f"The number of unknown key bits must be between 1 and {len(EFFECTIVE_KEY_BITS)}.")
+        if not 1 <= rounds <= 16:
+            raise ValueError("The number of rounds must be between 1 and 16.")
+        if not pairs:
+            raise ValueError("At least one known plaintext/ciphertext pair is needed.")
+        self.pairs = [(int(p), int(c)) for p, c in pairs]
+        self.positions = EFFECTIVE_KEY_BITS[-unknown_bits:]
+        self.key_bits = [key_bit(position) for position in self.positions]
+        self.base_key = int(base_key) & ~sum(self.key_bits)
+        self.rounds = rounds
+        # The key schedule is linear, so each key bit adds a fixed pattern to the 16 subkeys.
+        self.contributions = [key_schedule(bit) for bit in self.key_bits]
+
+        plaintext, ciphertext = self.pairs[0]
+        x = apply_permutation(plaintext, IP)
+        self.l0, self.r0 = x >> 32, x & 0xFFFFFFFF
+        # IP undoes FP, so the ciphertext gives (R_n, L_n) once for all candidates.
+        y = apply_permutation(ciphertext, IP)
+        self.target_r, self.target_l = y >> 32, y & 0xFFFFFFFF
+
+    @property
+    def size(self):
+        return 1 << len(self.positions)
+
+    def key_for_index(self, index):
+        key = self.base_key
+        for b, bit in enumerate(self.key_bits):
+            if (index >> b) & 1:
+                key |= bit
+        return key
+
+    def verify(self, key):
+        return all(encrypt_rounds(key, plaintext, self.rounds) == ciphertext for plaintext, ciphertext in self.pairs)
+
+    def search_scalar(self, start, end):
+        # Keys are visited in Gray-code order, so neighbours differ in one bit and the subkeys are
+        # patched with 16 XORs instead of being rescheduled.
+        gray = start ^ (start >> 1)
+        key = self.key_for_index(gray)
+        subkeys = list(key_schedule(key))[:self.rounds]
+        contributions = [contribution[:self.rounds] for contribution in self.contributions]
+        l0, r0, target_l, target_r = self.l0, self.r0, self.target_l, self.target_r
+        last = self.rounds - 1
+        found = []
+        for i in range(start, end):
+            if i != start:
+                bit = (i & -i).bit_length() - 1
+                key ^= self.key_bits[bit]
+                subkeys = [a ^ b for a, b in zip(subkeys, contributions[bit])]
+            l, r = des_rounds(l0, r0, subkeys[:last])
+            # L_n equals R_(n-1): most candidates fail here, before the last round.
+            if r != target_l:
+                continue
+            if l ^ feistel(r, subkeys[last]) == target_r and self.verify(key):
+                found.append(key)
+        return found
+
+    def search_sliced(self, start, end):
+        # 64 candidate keys per word, lanes of a uint64 array per call (see bitslice.py).
+        ones = bitslice.ARRAY_ONES
+        keys = keys_for_indices(self.base_key, self.key_bits, np.arange(start, end, dtype=np.uint64))
+        key_slices = list(bitslice.pack_array(keys, 64))
+        round_keys = bitslice.round_keys_sliced(key_slices)[:self.rounds]
+        l = bitslice.constant_slices(self.l0, 32, ones)
+        r = bitslice.constant_slices(self.r0, 32, ones)
+        l, r = bitslice.des_rounds_sliced(l, r, round_keys[:-1], ones)
+        mismatch = np.zeros(len(key_slices[0]), dtype=np.uint64)
+        for i, word in enumerate(r):
+            mismatch |= word ^ (ones if (self.target_l >> (31 - i)) & 1 else np.uint64(0))
+        if (mismatch == ones).all():
+            return []
+        f = bitslice.feistel_sliced(r, round_keys[-1], ones)
+        for i, (a, b) in enumerate(zip(l, f)):
+            mismatch |= a ^ b ^ (ones if (self.target_r >> (31 - i)) & 1 else np.uint64(0))
+        survivors = np.flatnonzero(np.unpackbits((~mismatch).view(np.uint8), bitorder='little')[:len(keys)])
+        return [int(keys[lane]) for lane in survivors if self.verify(int(keys[lane]))]
+
+
+_search = None
+
+
+def _init_worker(search):
+    global _search
+    _search = search
+
+
+def _search_chunk(engine, start, end):
+    began = time.perf_counter()
+    found = _search.search_scalar(start, end) if engine == "scalar" else _search.search_sliced(start, end)
+    return found, end - start, time.perf_counter() - began
+
+
+def search_description(search, chunk_keys, engine):
+    # The engine is part of the search: scalar chunk k covers Gray-code block gray(k) and
+    # bitslice chunk k covers block k, so resuming with the other engine would skip blocks.
+    return {
+        "pairs": [[f"{p:016X}", f"{c:016X}"] for p, c in search.pairs],
+        "base_key": f"{search.base_key:016X}",
+        "unknown_bits": len(search.positions),
+        "rounds": search.rounds,
+        "chunk_keys": chunk_keys,
+        "engine": engine,
+    }
+
+
+def load_checkpoint(path, description):
+    if not path or not os.path.exists(path):
+        return {"next_chunk": 0, "found": [], "keys_tested": 0, "busy_seconds": 0.0}
+    with open(path, encoding="utf-8") as source:
+        state = json.load(source)
+    if state.get("version") != CHECKPOINT_VERSION or state.get("search") != description:
+        raise ValueError(f"Checkpoint '{path}' belongs to a different search.")
+    return state
+
+
+def save_checkpoint(path, description, state):
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as target:
+        json.dump({"version": CHECKPOINT_VERSION, "search": description, **state}, target)
+    os.replace(temporary, path)
+
+
+def run_search(search, engine="bitslice", workers=None, chunk_keys=CHUNK_KEYS, checkpoint=None,
+               checkpoint_interval=CHECKPOINT_INTERVAL, find_all=False, progress=None):
+    # Chunks complete in order, so the checkpoint only needs the index of the next unfinished chunk.
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose one of: {', '.join(ENGINES)}.")
+    workers = workers or os.cpu_count() or 1
+    description = search_description(search, chunk_keys, engine)
+    state = load_checkpoint(checkpoint, description)
+    chunks = range(state["next_chunk"], -(-search.size // chunk_keys))
+    if state["found"] and not find_all:
+        chunks = range(0)
+    last_save = time.perf_counter()
+
+    def record(result):
+        found, count, busy = result
+        state["next_chunk"] += 1
+        state["found"].extend(f"{key:016X}" for key in found)
+        state["keys_tested"] += count
+        state["busy_seconds"] += busy
+        if progress:
+            progress(state)
+        return bool(found) and not find_all
+
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(search,))
+    try:
+        pending = deque()
+        stop = False
+        for chunk in chunks:
+            start = chunk * chunk_keys
+            pending.append(pool.submit(_search_chunk, engine, start, min(start + chunk_keys, search.size)))
+            if len(pending) >= 2 * workers:
+                stop = record(pending.popleft().result())
+            if checkpoint and time.perf_counter() - last_save >= checkpoint_interval:
+                save_checkpoint(checkpoint, description, state)
+                last_save = time.perf_counter()
+            if stop:
+                break
+        while pending and not stop:
+            stop = record(pending.popleft().result())
+    finally:
+        # Also reached on Ctrl-C: unfinished chunks are simply searched again on resume.
+        pool.shutdown(cancel_futures=True)
+        if checkpoint:
+            save_checkpoint(checkpoint, description, state)
+    return [int(key, 16) for key in state["found"]], state
+
+
+def parse_pair(text):
+    plaintext, _, ciphertext = text.partition(":")
+    try:
+        return int(plaintext, 16), int(ciphertext, 16)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid pair '{text}'. Use PLAINTEXT:CIPHERTEXT in hex.") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exhaustive DES key search over a reduced keyspace")
+    parser.add_argument("--pair", type=parse_pair, action="append", default=[],
+                        help="known PLAINTEXT:CIPHERTEXT in hex (repeat to confirm candidates)")
+    parser.add_argument("--key-hint", default="0", help="hex key with the known bits set; unknown bits are ignored")
+    parser.add_argument("--unknown-bits", type=int, default=24, help="number of unknown effective key bits (1-56)")
+    parser.add_argument("--rounds", type=int, default=16, help="DES rounds (reduced-round variants for teaching)")
+    parser.add_argument("--demo", action="store_true", help="search for a random key with random known pairs")
+    parser.add_argument("--engine", choices=ENGINES, default="bitslice")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--chunk-keys", type=int, default=CHUNK_KEYS, help="keys per task")
+    parser.add_argument("--checkpoint", help="JSON file to resume from and save progress to")
+    parser.add_argument("--checkpoint-interval", type=float, default=CHECKPOINT_INTERVAL, help="seconds between saves")
+    parser.add_argument("--all", action="store_true", help="keep searching after the first key is found")
+    args = parser.parse_args(argv)
+
+    try:
+        key_hint = int(args.key_hint, 16)
+        pairs = args.pair
+        if args.demo:
+            secret = random.getrandbits(64)
+            pairs = [(p, encrypt_rounds(secret, p, args.rounds)) for p in (random.getrandbits(64) for _ in range(2))]
+            key_hint = secret
+            print(f"Demo key: 0x{secret:016X}", file=sys.stderr)
+        search = KeySearch(pairs, key_hint, args.unknown_bits, args.rounds)
+        start = time.perf_counter()
+        found, state = run_search(search, args.engine, args.workers, args.chunk_keys, args.checkpoint,
+                                  args.checkpoint_interval, args.all)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print(f"\nInterrupted.{f' Progress saved to {args.checkpoint}.' if args.checkpoint else ''}", file=sys.stderr)
+        return 130
+    elapsed = time.perf_counter() - start
+
+    for key in found:
+        print(f"Key found: 0x{key:016X}")
+    if not found:
+        print("No key in the searched keyspace matches.")
+    tested = state["keys_tested"]
+    per_core = tested / state["busy_seconds"] if state["busy_seconds"] else 0.0
+    print(f"Tested {tested:,} of {search.size:,} keys ({elapsed:.2f} s this run); "
+          f"{per_core:,.0f} keys/s per core ({args.engine})", file=sys.stderr)
+    return 0 if found else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from avalanche import des_array, key_schedule_array
+from bruteforce import EFFECTIVE_KEY_BITS, key_bit, keys_for_indices, parse_pair
+from des import DES
+
+MEMORY_MB = 256
+CHUNK_KEYS = 1 << 18
+BLOOM_BITS_PER_RECORD = 8
+# Odd 64-bit multipliers; the top bits of value * multiplier index the bloom filter.
+BLOOM_MULTIPLIERS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+
+
+def record_dtype(bits):
+    return np.dtype([('block', '<u8'), ('index', '<u4' if bits <= 32 else '<u8')])
+
+
+class DoubleDES:
+    __slots__ = ('pairs', 'bits', 'base1', 'base2', 'key_bits')
+
+    def __init__(self, pairs, bits, key1_hint=0, key2_hint=0):
+        if not 1 <= bits <= len(EFFECTIVE_KEY_BITS):
+            raise ValueError(f"The number of unknown bits per key must be between 1 and {len(EFFECTIVE_KEY_BITS)}.")
+        if not pairs:
+            raise ValueError("At least one known plaintext/ciphertext pair is needed.")
+        self.pairs = [(int(p), int(c)) for p, c in pairs]
+        self.bits = bits
+        self.key_bits = [key_bit(position) for position in EFFECTIVE_KEY_BITS[-bits:]]
+        mask = ~sum(self.key_bits)
+        self.base1 = int(key1_hint) & mask
+        self.base2 = int(key2_hint) & mask
+
+    @property
+    def size(self):
+        return 1 << self.bits
+
+    def keys(self, base, start, end):
+        return keys_for_indices(base, self.key_bits, np.arange(start, end, dtype=np.uint64))
+
+    def forward(self, start, end):
+        # E_K1(P) for every K1 index in [start, end).
+        keys = self.keys(self.base1, start, end)
+        plaintext = np.full(len(keys), self.pairs[0][0], dtype=np.uint64)
+        return des_array(plaintext, key_schedule_array(keys))
+
+    def backward(self, start, end):
+        # D_K2(C) for every K2 index in [start, end).
+        keys = self.keys(self.base2, start, end)
+        ciphertext = np.full(len(keys), self.pairs[0][1], dtype=np.uint64)
+        return des_array(ciphertext, key_schedule_array(keys)[::-1])
+
+    def verify(self, key1, key2):
+        return all(DES(key2).encrypt_int(DES(key1).encrypt_int(p)) == c for p, c in self.pairs[1:])
+
+
+def bloom_positions(blocks, log_bits):
+    shift = np.uint64(64 - log_bits)
+    return [(blocks * np.uint64(multiplier)) >> shift for multiplier in BLOOM_MULTIPLIERS]
+
+
+def bloom_add(bloom, blocks, log_bits):
+    for positions in bloom_positions(blocks, log_bits):
+        np.bitwise_or.at(bloom, positions >> np.uint64(6), np.uint64(1) << (positions & np.uint64(63)))
+
+
+def bloom_contains(bloom, blocks, log_bits):
+    hit = np.ones(len(blocks), dtype=bool)
+    for positions in bloom_positions(blocks, log_bits):
+        hit &= ((bloom[positions >> np.uint64(6)] >> (positions & np.uint64(63))) & np.uint64(1)).astype(bool)
+    return hit
+
+
+_attack = None
+_runs = None
+_bloom = None
+
+
+def _init_worker(attack, run_paths=(), bloom_path=None):
+    global _attack, _runs, _bloom
+    _attack = attack
+    _runs = [np.load(path, mmap_mode='r') for path in run_paths]
+    _bloom = np.load(bloom_path, mmap_mode='r') if bloom_path else None
+
+
+def _forward_run(start, end, path):
+    blocks = _attack.forward(start, end)
+    records = np.empty(len(blocks), dtype=record_dtype(_attack.bits))
+    records['block'] = blocks
+    records['index'] = np.arange(start, end, dtype=np.uint64)
+    records.sort(order='block', kind='stable')
+    np.save(path, records)
+    return path
+
+
+def _backward_probe(start, end):
+    blocks = _attack.backward(start, end)
+    indices = np.arange(start, end, dtype=np.uint64)
+    if _bloom is not None:
+        hit = bloom_contains(_bloom, blocks, int(len(_bloom) * 64).bit_length() - 1)
+        blocks, indices = blocks[hit], indices[hit]
+    matches = []
+    for run in _runs:
+        # Binary search every probe in the sorted, memory-mapped run.
+        column = run['block']
+        left = np.searchsorted(column, blocks, side='left')
+        right = np.searchsorted(column, blocks, side='right')
+        for probe in np.flatnonzero(right > left):
+            for row in range(left[probe], right[probe]):
+                matches.append((int(run['index'][row]), int(indices[probe])))
+    return matches
+
+
+def run_attack(attack, workers=None, memory_mb=MEMORY_MB, chunk_keys=CHUNK_KEYS, work_dir=None, use_bloom=True):
+    if memory_mb <= 0:
+        raise ValueError("The memory budget must be at least 1 MB.")
+    workers = workers or os.cpu_count() or 1
+    record_size = record_dtype(attack.bits).itemsize
+    budget = max(1, memory_mb * (1 << 20) // record_size)
+    run_keys = max(1, min(chunk_keys, budget // workers))
+    directory = tempfile.mkdtemp(prefix="mitm-", dir=work_dir)
+    stats = {"records": attack.size, "record_size": record_size, "memory_budget": budget * record_size}
+    try:
+        # Forward half: each worker encrypts a range of K1, sorts it and writes it as a run file.
+        began = time.perf_counter()
+        bounds = [(start, min(start + run_keys, attack.size)) for start in range(0, attack.size, run_keys)]
+        paths = [os.path.join(directory, f"run{number:06d}.npy") for number in range(len(bounds))]
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(attack,)) as pool:
+            for _ in pool.map(_forward_run, *zip(*bounds), paths):
+                pass
+
+        bloom_path = None
+        if attack.size <= budget:
+            # The whole table fits the budget: merge the runs into one sorted table.
+            table = np.concatenate([np.load(path) for path in paths])
+            table.sort(order='block', kind='stable')
+            for path in paths:
+                os.remove(path)
+            paths = [os.path.join(directory, "table.npy")]
+            np.save(paths[0], table)
+            del table
+        elif use_bloom:
+            log_bits = max(6, (attack.size * BLOOM_BITS_PER_RECORD - 1).bit_length())
+            bloom = np.zeros(1 << (log_bits - 6), dtype=np.uint64)
+            for path in paths:
+                bloom_add(bloom, np.load(path, mmap_mode='r')['block'], log_bits)
+            bloom_path = os.path.join(directory, "bloom.npy")
+            np.save(bloom_path, bloom)
+            stats["bloom_bytes"] = bloom.nbytes
+            del bloom
+        stats["runs"] = len(paths)
+        stats["disk_bytes"] = sum(os.path.getsize(path) for path in paths)
+        stats["forward_seconds"] = time.perf_counter() - began
+
+        # Backward half: decrypt C under every K2 and probe the table.
+        began = time.perf_counter()
+        found = []
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(attack, paths, bloom_path)) as pool:
+            pending = deque()
+            for start in range(0, attack.size, chunk_keys):
+                pending.append(pool.submit(_backward_probe, start, min(start + chunk_keys, attack.size)))
+                if len(pending) >= 2 * workers:
+                    found.extend(pending.popleft().result())
+            while pending:
+                found.extend(pending.popleft().result())
+        stats["backward_seconds"] = time.perf_counter() - began
+        stats["candidates"] = len(found)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    keys = []
+    for index1, index2 in found:
+        key1 = int(attack.keys(attack.base1, index1, index1 + 1)[0])
+        key2 = int(attack.keys(attack.base2, index2, index2 + 1)[0])
+        if attack.verify(key1, key2):
+            keys.append((key1, key2))
+    stats["des_per_second"] = 2 * attack.size / (stats["forward_seconds"] + stats["backward_seconds"])
+    return keys, stats
+
+
+def tradeoff_curve(bits, record_size, des_per_second):
+    # A table of 2^t entries covers 2^(bits - t) slices of the K1 space; each slice needs a full
+    # backward pass over K2. t = bits is the classic meet-in-the-middle point, t = 0 is brute force.
+    rows = []
+    for table_bits in range(bits, -1, -max(1, bits // 8)):
+        passes = 1 << (bits - table_bits)
+        operations = (1 << bits) + passes * (1 << bits)
+        rows.append((table_bits, (1 << table_bits) * record_size, operations, operations / des_per_second))
+    return rows
+
+
+def format_bytes(count):
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if count < 1024 or unit == "TiB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Meet-in-the-middle attack on double DES over a reduced keyspace")
+    parser.add_argument("--pair", type=parse_pair, action="append", default=[],
+                        help="known PLAINTEXT:CIPHERTEXT in hex; extra pairs filter false matches")
+    parser.add_argument("--bits", type=int, default=20, help="unknown effective bits in each of K1 and K2")
+    parser.add_argument("--key1-hint", default="0", help="hex K1 with the known bits set")
+    parser.add_argument("--key2-hint", default="0", help="hex K2 with the known bits set")
+    parser.add_argument("--demo", action="store_true", help="attack random keys with random known pairs")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_MB, help="table size kept in RAM before spilling runs")
+    parser.add_argument("--chunk-keys", type=int, default=CHUNK_KEYS, help="keys per task")
+    parser.add_argument("--work-dir", default=None, help="directory for run files (default: system temp)")
+    parser.add_argument("--no-bloom", action="store_true", help="probe spilled runs without the bloom filter")
+    args = parser.parse_args(argv)
+
+    try:
+        pairs = args.pair
+        key1_hint, key2_hint = int(args.key1_hint, 16), int(args.key2_hint, 16)
+        if args.demo:
+            key1_hint, key2_hint = random.getrandbits(64), random.getrandbits(64)
+            plaintexts = [random.getrandbits(64) for _ in range(2)]
+            pairs = [(p, DES(key2_hint).encrypt_int(DES(key1_hint).encrypt_int(p))) for p in plaintexts]
+            print(f"Demo keys: K1=0x{key1_hint:016X} K2=0x{key2_hint:016X}", file=sys.stderr)
+        attack = DoubleDES(pairs, args.bits, key1_hint, key2_hint)
+        keys, stats = run_attack(attack, args.workers, args.memory_mb, args.chunk_keys, args.work_dir,
+                                 not args.no_bloom)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    for key1, key2 in keys:
+        print(f"Keys found: K1=0x{key1:016X} K2=0x{key2:016X}")
+    if not keys:
+        print("No key pair in the searched keyspace matches.")
+
+    print(f"\nForward: {stats['records']:,} records in {stats['runs']} run(s), "
+          f"{format_bytes(stats['disk_bytes'])} on disk, {stats['forward_seconds']:.2f} s", file=sys.stderr)
+    print(f"Backward: {stats['candidates']} candidate(s), {stats['backward_seconds']:.2f} s "
+          f"({stats['des_per_second']:,.0f} DES/s)", file=sys.stderr)
+    print("\nTime/memory trade-off (table entries, table size, DES operations, estimated time):", file=sys.stderr)
+    for table_bits, memory, operations, seconds in tradeoff_curve(args.bits, stats["record_size"], stats["des_per_second"]):
+        marker = " <- this run" if table_bits == args.bits else ""
+        print(f"  2^{table_bits:<2d} {format_bytes(memory):>10s}  2^{np.log2(operations):5.1f}  {seconds:12,.1f} s{marker}",
+              file=sys.stderr)
+    return 0 if keys else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+
+import argparse
+import io
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+
+from des import BLOCK_SIZE, DES, TripleDES
+
+MODES = ("ecb", "cbc", "ctr")
+CHUNK_SIZE = 1 << 20
+READ_AHEAD = 4
+
+
+def new_cipher(key):
+    key = bytes(key)
+    return DES(key) if len(key) == BLOCK_SIZE else TripleDES(key)
+
+
+def to_blocks(data):
+    return np.frombuffer(data, dtype='>u8').tolist()
+
+
+def from_blocks(blocks):
+    return np.array(blocks, dtype='>u8').tobytes()
+
+
+def check_aligned(data):
+    if len(data) % BLOCK_SIZE:
+        raise ValueError(f"Data length must be a multiple of {BLOCK_SIZE} bytes, got {len(data)}.")
+
+
+def pad(data):
+    count = BLOCK_SIZE - len(data) % BLOCK_SIZE
+    return bytes(data) + bytes([count]) * count
+
+
+def unpad(data):
+    count = data[-1] if len(data) else 0
+    if not 1 <= count <= BLOCK_SIZE or len(data) % BLOCK_SIZE or bytes(data[-count:]) != bytes([count]) * count:
+        raise ValueError("Invalid padding. Wrong key, IV or corrupted ciphertext.")
+    return bytes(data[:-count])
+
+
+def ecb_encrypt(cipher, data):
+    check_aligned(data)
+    encrypt = cipher.encrypt_int
+    return from_blocks([encrypt(block) for block in to_blocks(data)])
+
+
+def ecb_decrypt(cipher, data):
+    check_aligned(data)
+    decrypt = cipher.decrypt_int
+    return from_blocks([decrypt(block) for block in to_blocks(data)])
+
+
+def cbc_encrypt(cipher, data, iv):
+    check_aligned(data)
+    encrypt = cipher.encrypt_int
+    previous = int.from_bytes(iv, 'big')
+    out = []
+    for block in to_blocks(data):
+        previous = encrypt(block ^ previous)
+        out.append(previous)
+    return from_blocks(out)
+
+
+def cbc_decrypt(cipher, data, iv):
+    # Every plaintext block only needs two ciphertext blocks, so any range decrypts independently.
+    check_aligned(data)
+    decrypt = cipher.decrypt_int
+    blocks = np.frombuffer(data, dtype='>u8')
+    previous = np.empty_like(blocks)
+    previous[:1] = int.from_bytes(iv, 'big')
+    previous[1:] = blocks[:-1]
+    decrypted = np.array([decrypt(block) for block in blocks.tolist()], dtype='>u8')
+    return (decrypted ^ previous).astype('>u8').tobytes()
+
+
+def ctr_transform(cipher, data, nonce, start_block=0):
+    encrypt = cipher.encrypt_int
+    first = int.from_bytes(nonce, 'big') + start_block
+    count = -(-len(data) // BLOCK_SIZE)
+    keystream = from_blocks([encrypt((first + i) & 0xFFFFFFFFFFFFFFFF) for i in range(count)])
+    data = np.frombuffer(data, dtype=np.uint8)
+    return (data ^ np.frombuffer(keystream, dtype=np.uint8, count=len(data))).tobytes()
+
+
+def transform_chunk(cipher, mode, operation, chunk, iv, position, last):
+    if mode == "ctr":
+        return ctr_transform(cipher, chunk, iv, position // BLOCK_SIZE)
+    if operation == "encrypt":
+        if last:
+            chunk = pad(chunk)
+        return ecb_encrypt(cipher, chunk) if mode == "ecb" else cbc_encrypt(cipher, chunk, iv)
+    result = ecb_decrypt(cipher, chunk) if mode == "ecb" else cbc_decrypt(cipher, chunk, iv)
+    return unpad(result) if last else result
+
+
+_cipher = None
+
+
+def _init_worker(key):
+    global _cipher
+    _cipher = new_cipher(key)
+
+
+def _transform_chunk(mode, operation, chunk, iv, position, last):
+    return transform_chunk(_cipher, mode, operation, chunk, iv, position, last)
+
+
+class InlineExecutor:
+    # Runs submitted work immediately; used for one worker and for the sequential CBC encryption.
+
+    def __init__(self, key):
+        _init_worker(key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def read_full(source, size):
+    parts = []
+    while size > 0:
+        data = source.read(size)
+        if not data:
+            break
+        parts.append(data)
+        size -= len(data)
+    return b"".join(parts)
+
+
+def read_ahead(source, chunk_size, chunks, stop):
+    # Producer thread: keep up to maxsize chunks queued, each tagged with whether it is the last one.
+    try:
+        pending = read_full(source, chunk_size)
+        while not stop.is_set():
+            following = read_full(source, chunk_size) if len(pending) == chunk_size else b""
+            chunks.put((pending, not following))
+            if not following:
+                break
+            pending = following
+    except Exception as e:
+        chunks.put(e)
+
+
+def transform_stream(source, target, key, mode="cbc", operation="encrypt", iv=None, workers=None,
+                     chunk_size=CHUNK_SIZE, read_ahead_chunks=READ_AHEAD):
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}'. Choose one of: {', '.join(MODES)}.")
+    if chunk_size <= 0 or chunk_size % BLOCK_SIZE:
+        raise ValueError(f"Chunk size must be a positive multiple of {BLOCK_SIZE} bytes.")
+    new_cipher(key)
+    if mode != "ecb":
+        if operation == "encrypt":
+            iv = os.urandom(BLOCK_SIZE) if iv is None else bytes(iv)
+            target.write(iv)
+        else:
+            iv = read_full(source, BLOCK_SIZE)
+        if len(iv) != BLOCK_SIZE:
+            raise ValueError(f"The IV/nonce must be {BLOCK_SIZE} bytes long.")
+
+    workers = workers or os.cpu_count() or 1
+    sequential = workers == 1 or (mode == "cbc" and operation == "encrypt")
+    chunks = queue.Queue(maxsize=read_ahead_chunks)
+    stop = threading.Event()
+    reader = threading.Thread(target=read_ahead, args=(source, chunk_size, chunks, stop), daemon=True)
+    reader.start()
+
+    total = 0
+    window = deque()
+    executor = InlineExecutor(key) if sequential else ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(key,))
+    try:
+        with executor:
+            last = False
+            while not last:
+                item = chunks.get()
+                if isinstance(item, Exception):
+                    raise item
+                chunk, last = item
+                if operation == "decrypt" and mode != "ctr" and (len(chunk) % BLOCK_SIZE or (last and not chunk)):
+                    raise ValueError(f"Ciphertext length must be a non-zero multiple of {BLOCK_SIZE} bytes.")
+                window.append(executor.submit(_transform_chunk, mode, operation, chunk, iv, total, last))
+                total += len(chunk)
+                if mode == "cbc" and chunk:
+                    # The next CBC chunk chains on the last ciphertext block, read from the input or output.
+                    iv = chunk[-BLOCK_SIZE:] if operation == "decrypt" else window[-1].result()[-BLOCK_SIZE:]
+                while len(window) > workers * 2 or (last and window):
+                    target.write(window.popleft().result())
+    finally:
+        stop.set()
+        while reader.is_alive():
+            try:
+                chunks.get_nowait()
+            except queue.Empty:
+                reader.join(0.01)
+    return total
+
+
+def encrypt_bytes(data, key, mode="cbc", iv=None, workers=1, chunk_size=CHUNK_SIZE):
+    target = io.BytesIO()
+    transform_stream(io.BytesIO(bytes(data)), target, key, mode, "encrypt", iv, workers, chunk_size)
+    return target.getvalue()
+
+
+def decrypt_bytes(data, key, mode="cbc", workers=1, chunk_size=CHUNK_SIZE):
+    target = io.BytesIO()
+    transform_stream(io.BytesIO(bytes(data)), target, key, mode, "decrypt", None, workers, chunk_size)
+    return target.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DES/3DES file encryption in ECB, CBC or CTR mode")
+    parser.add_argument("operation", choices=["encrypt", "decrypt"])
+    parser.add_argument("-k", "--key", required=True, help="hex key: 8 bytes for DES, 16 or 24 bytes for 3DES (EDE)")
+    parser.add_argument("-m", "--mode", choices=MODES, default="cbc")
+    parser.add_argument("-i", "--input", required=True, help="input file")
+    parser.add_argument("-o", "--output", required=True, help="output file")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="bytes per task")
+    parser.add_argument("--read-ahead", type=int, default=READ_AHEAD, help="chunks buffered ahead of the workers")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        key = bytes.fromhex(args.key)
+        with open(args.input, "rb") as source, open(args.output, "wb") as target:
+            total = transform_stream(source, target, key, args.mode, args.operation, None, args.workers,
+                                     args.chunk_size, args.read_ahead)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"Processed {total} bytes in {elapsed:.3f} s ({rate / 1e6:.2f} MB/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
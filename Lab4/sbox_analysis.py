@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import heapq
+import os
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from Task1 import E_TABLE, S_BOX_ARRAY
+from des import E, P_TABLE, apply_permutation, build_permutation
+
+TABLES_VERSION = 1
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__")
+PARITY = np.array([bin(value).count("1") & 1 for value in range(64)], dtype=np.uint8)
+P_INVERSE_TABLE = [P_TABLE.index(position) + 1 for position in range(1, 33)]
+P = build_permutation(P_TABLE, 32)
+P_INVERSE = build_permutation(P_INVERSE_TABLE, 32)
+
+
+def compute_ddt(s_boxes=S_BOX_ARRAY):
+    # ddt[j, dx, dy] = #{x : S_j(x) ^ S_j(x ^ dx) == dy}
+    x = np.arange(64)
+    dy = s_boxes[:, x[None, :] ^ x[:, None]] ^ s_boxes[:, None, :]
+    return (dy[..., None] == np.arange(16)).sum(axis=2, dtype=np.int16)
+
+
+def compute_lat(s_boxes=S_BOX_ARRAY):
+    # lat[j, a, c] = #{x : a.x == c.S_j(x)} - 32
+    x = np.arange(64)
+    input_parity = PARITY[x[:, None] & x[None, :]]
+    output_parity = PARITY[np.arange(16)[None, :, None] & s_boxes[:, None, :]]
+    agree = input_parity[None, :, None, :] == output_parity[:, None, :, :]
+    return (agree.sum(axis=3, dtype=np.int16) - 32).astype(np.int16)
+
+
+def tables_digest(s_boxes=S_BOX_ARRAY):
+    return hashlib.sha256(np.ascontiguousarray(s_boxes, dtype=np.uint8).tobytes()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=4)
+def load_tables(cache_dir=CACHE_DIR):
+    # The file name carries the format version and a hash of the S-boxes, so stale caches are never read.
+    path = os.path.join(cache_dir, f"sbox_tables_v{TABLES_VERSION}_{tables_digest()}.npy")
+    if os.path.exists(path):
+        try:
+            stored = np.load(path)
+        except (OSError, ValueError):
+            stored = np.zeros(0)
+        if stored.shape == (2, 8, 64, 16):
+            return stored[0], stored[1]
+    ddt, lat = compute_ddt(), compute_lat()
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(temporary, "wb") as target:
+            np.save(target, np.stack([ddt, lat]))
+        os.replace(temporary, path)
+    except OSError:
+        # Read-only location: keep the tables in memory only.
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return ddt, lat
+
+
+def ddt(box):
+    return load_tables()[0][box - 1]
+
+
+def lat(box):
+    return load_tables()[1][box - 1]
+
+
+def differential_probability(box, dx, dy):
+    return int(ddt(box)[dx, dy]) / 64
+
+
+def linear_bias(box, a, c):
+    return int(lat(box)[a, c]) / 64
+
+
+def best_differentials(box=None, count=10):
+    table = load_tables()[0].astype(np.int64)
+    table[:, 0, :] = 0
+    boxes = range(1, 9) if box is None else [box]
+    found = [(int(table[j - 1, dx, dy]) / 64, j, dx, dy)
+             for j in boxes for dx, dy in zip(*np.nonzero(table[j - 1]))]
+    return [(j, int(dx), int(dy), p) for p, j, dx, dy in heapq.nlargest(count, found)]
+
+
+def best_linear_approximations(box=None, count=10):
+    table = load_tables()[1].astype(np.int64)
+    table[:, :, 0] = 0
+    boxes = range(1, 9) if box is None else [box]
+    found = [(abs(int(table[j - 1, a, c])), j, a, c)
+             for j in boxes for a, c in zip(*np.nonzero(table[j - 1]))]
+    return [(j, int(a), int(c), int(table[j - 1, a, c]) / 64) for _, j, a, c in heapq.nlargest(count, found)]
+
+
+# Round-level propagation. A 32-bit word is cut into the eight 6-bit S-box inputs through E and
+# reassembled from the eight 4-bit outputs through P.
+
+def expand(value):
+    return apply_permutation(value, E)
+
+
+def expand_transpose(mask):
+    # Mask on R equivalent to a mask on E(R): each E output bit folds back onto its source bit.
+    result = 0
+    for i, position in enumerate(E_TABLE):
+        if (mask >> (47 - i)) & 1:
+            result ^= 1 << (32 - position)
+    return result
+
+
+def box_parts(value, width):
+    return [(value >> (width * (7 - j))) & ((1 << width) - 1) for j in range(8)]
+
+
+@lru_cache(maxsize=None)
+def difference_options(box, dx, branch):
+    row = ddt(box)[dx]
+    order = np.argsort(-row, kind="stable")[:branch]
+    return tuple((int(dy), int(row[dy]) / 64) for dy in order if row[dy])
+
+
+@lru_cache(maxsize=None)
+def mask_options(box, c, branch):
+    column = lat(box)[:, c]
+    order = np.argsort(-np.abs(column), kind="stable")[:branch]
+    return tuple((int(a), int(column[a]) / 64) for a in order if column[a])
+
+
+@lru_cache(maxsize=1 << 16)
+def round_differences(delta_r, branch, limit):
+    # The most likely output differences of F for delta_r, at most limit of them.
+    results = [(0, 1.0)]
+    for j, dx in enumerate(box_parts(expand(delta_r), 6)):
+        if dx:
+            results = [((dy_word << 4) | dy, p * q)
+                       for dy_word, p in results for dy, q in difference_options(j + 1, dx, branch)]
+            results = heapq.nlargest(limit, results, key=lambda result: result[1])
+        else:
+            results = [(dy_word << 4, p) for dy_word, p in results]
+    return tuple((apply_permutation(dy_word, P), p) for dy_word, p in results)
+
+
+@lru_cache(maxsize=1 << 16)
+def round_masks(beta, branch, limit):
+    # Input masks on R correlated with beta.F(R), at most limit of them; biases are combined
+    # with the piling-up lemma.
+    results = [(0, 0.5, 0)]
+    for j, c in enumerate(box_parts(apply_permutation(beta, P_INVERSE), 4)):
+        if c:
+            results = [((a_word << 6) | a, bias * eps * 2, active + 1)
+                       for a_word, bias, active in results for a, eps in mask_options(j + 1, c, branch)]
+            results = heapq.nlargest(limit, results, key=lambda result: abs(result[1]))
+        else:
+            results = [(a_word << 6, bias, active) for a_word, bias, active in results]
+    return tuple((expand_transpose(a_word), bias, active) for a_word, bias, active in results)
+
+
+def single_box_words():
+    inputs = [expand_transpose(a << (6 * (7 - j))) for j in range(8) for a in range(1, 64)]
+    outputs = [apply_permutation(c << (4 * (7 - j)), P) for j in range(8) for c in range(1, 16)]
+    # Differences that only reach one S-box through E are the inputs whose expansion stays in one slot.
+    inputs = [value for value in inputs if sum(1 for part in box_parts(expand(value), 6) if part) == 1]
+    return sorted(set([0] + inputs + outputs))
+
+
+def best_differential_trails(rounds=3, beam=256, branch=4, count=5):
+    # Beam search over (dL, dR) states; a zero right half costs nothing, which yields the
+    # classic iterative characteristics.
+    words = single_box_words()
+    trails = [(1.0, ((dl, dr),)) for dl in words for dr in words if dl or dr]
+    for _ in range(rounds):
+        extended = []
+        for p, states in trails:
+            dl, dr = states[-1]
+            for df, q in round_differences(dr, branch, beam):
+                extended.append((p * q, states + ((dr, dl ^ df),)))
+        trails = heapq.nlargest(beam, extended, key=lambda trail: trail[0])
+    return trails[:count]
+
+
+def best_linear_trails(rounds=3, beam=256, branch=4, count=5):
+    # State (mL, mR) are the masks on the round input; F is approximated with output mask mL.
+    words = single_box_words()
+    trails = [(0.5, 0, ((ml, mr),)) for ml in words for mr in words if ml or mr]
+    for _ in range(rounds):
+        extended = []
+        for bias, active, states in trails:
+            ml, mr = states[-1]
+            for alpha, eps, boxes in round_masks(ml, branch, beam):
+                total = active + boxes
+                combined = bias * eps * 2 if boxes else bias
+                extended.append((combined, total, states + ((mr ^ alpha, ml),)))
+        trails = heapq.nlargest(beam, extended, key=lambda trail: abs(trail[0]))
+    return [(bias, states) for bias, _, states in trails[:count]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Difference distribution and linear approximation tables of the DES S-boxes")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds for the characteristic search")
+    parser.add_argument("--beam", type=int, default=256, help="partial trails kept per round")
+    parser.add_argument("--count", type=int, default=5, help="results to print")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    load_tables()
+    print(f"Tables ready in {time.perf_counter() - start:.3f} s (v{TABLES_VERSION}, {tables_digest()})")
+
+    print("\nBest single S-box differentials:")
+    for box, dx, dy, p in best_differentials(count=args.count):
+        print(f"  S{box}: 0x{dx:02X} -> 0x{dy:X}  p = {p * 64:.0f}/64")
+    print("\nBest single S-box linear approximations:")
+    for box, a, c, bias in best_linear_approximations(count=args.count):
+        print(f"  S{box}: a = 0x{a:02X}, c = 0x{c:X}  bias = {bias * 64:+.0f}/64")
+
+    print(f"\nBest {args.rounds}-round differential characteristics found:")
+    for p, states in best_differential_trails(args.rounds, args.beam, count=args.count):
+        path = " -> ".join(f"({dl:08X},{dr:08X})" for dl, dr in states)
+        print(f"  p = 2^{np.log2(p):.2f}: {path}")
+    print(f"\nBest {args.rounds}-round linear characteristics found:")
+    for bias, states in best_linear_trails(args.rounds, args.beam, count=args.count):
+        path = " -> ".join(f"({ml:08X},{mr:08X})" for ml, mr in states)
+        print(f"  bias = {bias:+.4f}: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,20 @@
 #!/usr/bin/env python3
 
+import os
 import random
-from Crypto.Util.number import getPrime, GCD, inverse
+import sys
+from Crypto.Util.number import GCD, inverse
 from Crypto.Random import get_random_bytes
 
+from hybrid import decrypt_bytes, encrypt_bytes
+from primes import default_pool, get_prime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keystore import default_path, make_rsa_key, read_key, write_key
+
+KEY_ID = "lab5-task2.1"
+
 
 def text_to_decimal(text):
 
@@ -35,7 +46,48 @@ def decimal_to_text(decimal_value):
     return text, hex_string
 
 
-def generate_rsa_keys(key_size_bits=2048):
+class RSAPrivateKey:
+    __slots__ = ('d', 'n', 'p', 'q', 'dp', 'dq', 'qinv')
+
+    def __init__(self, d, n, p=None, q=None, crt=None):
+        self.d = d
+        self.n = n
+        self.p = p
+        self.q = q
+        self.dp = self.dq = self.qinv = None
+        if p is not None and q is not None:
+            if p * q != n:
+                raise ValueError("p * q does not match the modulus n")
+            if crt is not None:
+                self.dp, self.dq, self.qinv = crt
+            else:
+                self.dp = d % (p - 1)
+                self.dq = d % (q - 1)
+                self.qinv = inverse(q, p)
+
+    def __iter__(self):
+        # Unpacks like the original (d, n) tuple.
+        yield self.d
+        yield self.n
+
+    def __repr__(self):
+        return f"RSAPrivateKey({self.n.bit_length()}-bit n, crt={self.has_crt})"
+
+    @property
+    def has_crt(self):
+        return self.qinv is not None
+
+    def decrypt(self, ciphertext):
+        if not self.has_crt:
+            return pow(ciphertext, self.d, self.n)
+        # Two half-size exponentiations, recombined with Garner's formula.
+        m1 = pow(ciphertext, self.dp, self.p)
+        m2 = pow(ciphertext, self.dq, self.q)
+        h = (self.qinv * (m1 - m2)) % self.p
+        return m2 + h * self.q
+
+
+def generate_rsa_keys(key_size_bits=2048, prefetch=False):
     print("\n" + "=" * 80)
     print("RSA KEY GENERATION")
     print("=" * 80)
@@ -48,8 +100,16 @@ def generate_rsa_keys(key_size_bits=2048):
     p_bits = key_size_bits // 2
     q_bits = key_size_bits - p_bits
 
-    p = getPrime(p_bits)
-    q = getPrime(q_bits)
+    # Candidates are tested across a process pool (see primes.py); ready primes are used first.
+    # Callers that mint keys repeatedly pass prefetch=True so the next primes are found in the
+    # background while this key is in use.
+    if prefetch:
+        default_pool().prefetch(p_bits)
+        default_pool().prefetch(q_bits)
+    p = get_prime(p_bits)
+    q = get_prime(q_bits)
+    while q == p:
+        q = get_prime(q_bits)
 
     print(f"Generated p: {p_bits}-bit prime")
     print(f"Generated q: {q_bits}-bit prime")
@@ -101,8 +161,13 @@ def generate_rsa_keys(key_size_bits=2048):
     print(f"d = {d}")
     print(f"Verification: (e * d) mod φ(n) = {(e * d) % phi_n} ✓")
 
+    print(f"\nStep 6: Precompute CRT parameters for faster decryption")
+    private_key = RSAPrivateKey(d, n, p, q)
+    print(f"dp = d mod (p-1) = {private_key.dp}")
+    print(f"dq = d mod (q-1) = {private_key.dq}")
+    print(f"qinv = q^(-1) mod p = {private_key.qinv}")
+
     public_key = (n, e)
-    private_key = (d, n)
 
     print("\n" + "=" * 80)
     print("GENERATED KEYS")
@@ -113,6 +178,27 @@ def generate_rsa_keys(key_size_bits=2048):
     return public_key, private_key, p, q
 
 
+def load_rsa_keys(key_size_bits=2048, key_id=KEY_ID, store_path=None):
+    # Keys generated on an earlier run are read back from the key store, CRT parameters included.
+    # The store is closed while a new key is generated and reopened only to save it.
+    stored = read_key("rsa", key_id, key_size_bits, store_path)
+    if stored is None:
+        public_key, private_key, p, q = generate_rsa_keys(key_size_bits)
+        n, e = public_key
+        if write_key("rsa", key_id, key_size_bits, make_rsa_key(n, e, private_key.d, p, q), store_path):
+            print(f"\nKeys saved to {store_path or default_path()} as '{key_id}'")
+        return public_key, private_key, p, q
+
+    print("\n" + "=" * 80)
+    print("RSA KEY GENERATION")
+    print("=" * 80)
+    print(f"\nLoaded {key_size_bits}-bit key '{key_id}' from {store_path or default_path()}; key generation skipped.")
+    print(f"Public Key: (n, e) = ({stored.n}, {stored.e})")
+    print(f"Private Key: (d, n) = ({stored.d}, {stored.n})")
+    private_key = RSAPrivateKey(stored.d, stored.n, stored.p, stored.q, crt=(stored.dp, stored.dq, stored.qinv))
+    return (stored.n, stored.e), private_key, stored.p, stored.q
+
+
 def rsa_encrypt(message_decimal, public_key):
     n, e = public_key
 
@@ -140,6 +226,8 @@ def rsa_encrypt(message_decimal, public_key):
 
 
 def rsa_decrypt(ciphertext, private_key):
+    if not isinstance(private_key, RSAPrivateKey):
+        private_key = RSAPrivateKey(*private_key)
     d, n = private_key
 
     print("\n" + "=" * 80)
@@ -150,15 +238,53 @@ def rsa_decrypt(ciphertext, private_key):
     print(f"\nDecryption formula: m = c^d (mod n)")
 
 
-    message_decimal = pow(ciphertext, d, n)
+    message_decimal = private_key.decrypt(ciphertext)
 
     print(f"\nCalculation:")
-    print(f"  m = {ciphertext}^{d} mod {n}")
+    if private_key.has_crt:
+        print(f"  Using the CRT: m1 = c^dp mod p, m2 = c^dq mod q")
+        print(f"  h = qinv * (m1 - m2) mod p, m = m2 + h * q")
+    else:
+        print(f"  m = {ciphertext}^{d} mod {n}")
     print(f"  m = {message_decimal}")
 
     return message_decimal
 
 
+def rsa_hybrid_encrypt(message_bytes, public_key):
+    n, e = public_key
+
+    print("\n" + "=" * 80)
+    print("HYBRID RSA-KEM + AES ENCRYPTION")
+    print("=" * 80)
+    print(f"Message length: {len(message_bytes):,} bytes (limit for plain RSA: {(n.bit_length() - 1) // 8} bytes)")
+    print(f"\nStep 1: Choose random r < n and send c = r^e (mod n) - the only RSA operation")
+    print(f"Step 2: AES-256 key = SHA-256(r)")
+    print(f"Step 3: Encrypt the message in AES-GCM frames that can be decrypted one at a time")
+
+    container = encrypt_bytes(message_bytes, public_key)
+    print(f"\nContainer length: {len(container):,} bytes")
+
+    return container
+
+
+def rsa_hybrid_decrypt(container, private_key):
+    if not isinstance(private_key, RSAPrivateKey):
+        private_key = RSAPrivateKey(*private_key)
+
+    print("\n" + "=" * 80)
+    print("HYBRID RSA-KEM + AES DECRYPTION")
+    print("=" * 80)
+    print(f"Container length: {len(container):,} bytes")
+    print(f"\nStep 1: Recover r = c^d (mod n) and the AES-256 key = SHA-256(r)")
+    print(f"Step 2: Verify and decrypt each AES-GCM frame")
+
+    message_bytes = decrypt_bytes(container, private_key)
+    print(f"\nDecrypted length: {len(message_bytes):,} bytes")
+
+    return message_bytes
+
+
 def main():
     print("=" * 80)
     print("RSA ALGORITHM IMPLEMENTATION - Lab 5, Task 2.1")
@@ -190,7 +316,7 @@ def main():
     print(f"  Decimal value: {message_decimal}")
 
 
-    public_key, private_key, p, q = generate_rsa_keys(key_size_bits=2048)
+    public_key, private_key, p, q = load_rsa_keys(key_size_bits=2048)
     n, e = public_key
     d, _ = private_key
 
@@ -199,6 +325,7 @@ def main():
 
     if ciphertext is None:
         print("\n❌ Encryption failed: Message too large for modulus")
+        print("Use rsa_hybrid_encrypt for messages longer than the modulus.")
         return
 
 
@@ -245,6 +372,15 @@ def main():
     print(f"Decrypted message: '{decrypted_text}'")
 
 
+    long_message = message_text.encode('ascii') * 100_000
+    container = rsa_hybrid_encrypt(long_message, public_key)
+    recovered = rsa_hybrid_decrypt(container, private_key)
+    if recovered == long_message:
+        print("✓ Hybrid decryption successful! Messages match.")
+    else:
+        print("✗ Hybrid decryption failed! Messages do not match.")
+
+
 if __name__ == "__main__":
     try:
         main()
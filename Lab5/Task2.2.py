@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
 
+import os
 import random
+import sys
 from Crypto.Util.number import GCD, inverse
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keystore import ElGamalKey, default_path, read_key, write_key
+
+KEY_ID = "lab5-task2.2"
 
 
 P = 32317006071311007300153513477825163362488057133489075174588434139269806834136210002792056362640164685458556357935330816928829023080573472625273554742461245741026202527916572972862706300325263428213145766931414223654220941111348629991657478268034230553086349050635557712219187890332729569696129743856241741236237225197346402691855797767976823014625397933058015226858730761197532436467475855460715043896844940366130497697812854295958659597567051283852132784468522925504568272879113720098931873959143374175837826000278034973198552060607533234122603254684088120031105907484281003994966956119696956248629032338072839127039
@@ -81,6 +88,24 @@ def generate_elgamal_keys(p, g):
     return public_key, private_key
 
 
+def load_elgamal_keys(p, g, key_id=KEY_ID, store_path=None):
+    # The private key x is kept in the key store, so later runs reuse it for the same (p, g).
+    stored = read_key("elgamal", key_id, p.bit_length(), store_path)
+    if stored is None or (stored.p, stored.g) != (p, g):
+        public_key, private_key = generate_elgamal_keys(p, g)
+        if write_key("elgamal", key_id, p.bit_length(), ElGamalKey(p, g, public_key[2], private_key[0]), store_path):
+            print(f"\nKeys saved to {store_path or default_path()} as '{key_id}'")
+        return public_key, private_key
+
+    print("\n" + "=" * 80)
+    print("ELGAMAL KEY GENERATION")
+    print("=" * 80)
+    print(f"\nLoaded key '{key_id}' for the {p.bit_length()}-bit p from {store_path or default_path()}; key generation skipped.")
+    print(f"Public Key: (p, g, y) = ({p}, {g}, {stored.y})")
+    print(f"Private Key: (x, p) = ({stored.x}, {p})")
+    return (p, g, stored.y), (stored.x, p)
+
+
 def elgamal_encrypt(message_decimal, public_key):
     p, g, y = public_key
 
@@ -196,7 +221,7 @@ def main():
     print(f"  Decimal value: {message_decimal}")
 
 
-    public_key, private_key = generate_elgamal_keys(P, G)
+    public_key, private_key = load_elgamal_keys(P, G)
     p, g, y = public_key
     x, _ = private_key
 
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import io
+import os
+import struct
+import sys
+import time
+
+from Crypto.Cipher import AES
+from Crypto.Util.number import getRandomRange
+
+CHUNK_SIZE = 1 << 20
+MAGIC = b"RSAKEM\x00\x01"
+# magic, plaintext bytes per frame, encapsulated key length
+HEADER = struct.Struct(">8sIH")
+# ciphertext length, final-frame flag
+FRAME = struct.Struct(">IB")
+TAG_SIZE = 16
+
+
+def modulus_bytes(n):
+    return (n.bit_length() + 7) // 8
+
+
+def derive_key(secret, n):
+    # Same SHA-256 derivation as Task3.derive_aes_key, over the fixed-length encoding of the secret.
+    return hashlib.sha256(secret.to_bytes(modulus_bytes(n), 'big')).digest()
+
+
+def encapsulate(public_key):
+    # RSA-KEM: one exponentiation hides a random r < n; the AES key is derived from r.
+    n, e = public_key
+    secret = getRandomRange(2, n - 1)
+    return derive_key(secret, n), pow(secret, e, n).to_bytes(modulus_bytes(n), 'big')
+
+
+def decapsulate(private_key, encapsulated):
+    c = int.from_bytes(encapsulated, 'big')
+    if len(encapsulated) != modulus_bytes(private_key.n) or c >= private_key.n:
+        raise ValueError("The encapsulated key does not match this private key.")
+    return derive_key(private_key.decrypt(c), private_key.n)
+
+
+def frame_cipher(key, index, final):
+    # Frame i is sealed with AES-GCM under nonce i; the final flag is authenticated so a
+    # container cut at a frame boundary is rejected. The key is fresh per container.
+    cipher = AES.new(key, AES.MODE_GCM, nonce=struct.pack(">4xQ", index), mac_len=TAG_SIZE)
+    cipher.update(struct.pack(">QB", index, final))
+    return cipher
+
+
+def encrypt_stream(source, target, public_key, chunk_size=CHUNK_SIZE):
+    if not 1 <= chunk_size <= 0xFFFFFFFF - TAG_SIZE:
+        raise ValueError("The chunk size must be between 1 byte and 4 GiB.")
+    key, encapsulated = encapsulate(public_key)
+    target.write(HEADER.pack(MAGIC, chunk_size, len(encapsulated)) + encapsulated)
+    written = HEADER.size + len(encapsulated)
+    index = 0
+    chunk = source.read(chunk_size)
+    while True:
+        following = source.read(chunk_size) if len(chunk) == chunk_size else b""
+        final = not following
+        ciphertext, tag = frame_cipher(key, index, final).encrypt_and_digest(chunk)
+        target.write(FRAME.pack(len(ciphertext) + TAG_SIZE, final))
+        target.write(ciphertext)
+        target.write(tag)
+        written += FRAME.size + len(ciphertext) + TAG_SIZE
+        if final:
+            return written
+        chunk = following
+        index += 1
+
+
+def read_exact(source, size):
+    data = source.read(size)
+    if len(data) != size:
+        raise ValueError("The container is truncated.")
+    return data
+
+
+def decrypt_chunks(source, private_key):
+    # Yields each frame's plaintext as soon as its tag checks out, so output can be consumed
+    # before the whole container has been read.
+    magic, chunk_size, key_length = HEADER.unpack(read_exact(source, HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Not an RSA-KEM container.")
+    key = decapsulate(private_key, read_exact(source, key_length))
+    index = 0
+    while True:
+        header = source.read(FRAME.size)
+        if len(header) < FRAME.size:
+            raise ValueError("The container is truncated: the final frame is missing.")
+        length, final = FRAME.unpack(header)
+        if not TAG_SIZE <= length <= chunk_size + TAG_SIZE or final > 1:
+            raise ValueError(f"Frame {index} is malformed.")
+        frame = read_exact(source, length)
+        try:
+            yield frame_cipher(key, index, final).decrypt_and_verify(frame[:-TAG_SIZE], frame[-TAG_SIZE:])
+        except ValueError:
+            raise ValueError(f"Frame {index} failed authentication.") from None
+        if final:
+            if source.read(1):
+                raise ValueError("Unexpected data after the final frame.")
+            return
+        index += 1
+
+
+def decrypt_stream(source, target, private_key):
+    written = 0
+    for chunk in decrypt_chunks(source, private_key):
+        target.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def encrypt_bytes(data, public_key, chunk_size=CHUNK_SIZE):
+    target = io.BytesIO()
+    encrypt_stream(io.BytesIO(data), target, public_key, chunk_size)
+    return target.getvalue()
+
+
+def decrypt_bytes(container, private_key):
+    return b"".join(decrypt_chunks(io.BytesIO(container), private_key))
+
+
+def load_private_key(key_id, bits):
+    # The key comes from the key store filled by Task2.1.py; RSAPrivateKey lives in that script.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from keystore import KeyStore
+    from labs import load_lab_module
+
+    with KeyStore() as store:
+        stored = store.get("rsa", key_id, bits)
+        if stored is None:
+            raise ValueError(f"No {bits}-bit RSA key '{key_id}' in {store.path}. Run Task2.1.py once to create it.")
+    rsa = load_lab_module("Lab5", "Task2.1.py")
+    private_key = rsa.RSAPrivateKey(stored.d, stored.n, stored.p, stored.q, crt=(stored.dp, stored.dq, stored.qinv))
+    return (stored.n, stored.e), private_key
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hybrid RSA-KEM + AES-GCM file encryption")
+    parser.add_argument("operation", choices=("encrypt", "decrypt"))
+    parser.add_argument("input", help="input file ('-' for stdin)")
+    parser.add_argument("output", help="output file ('-' for stdout)")
+    parser.add_argument("--key-id", default="lab5-task2.1", help="RSA key in the key store")
+    parser.add_argument("--bits", type=int, default=2048, help="size of the stored RSA key")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="plaintext bytes per frame")
+    args = parser.parse_args(argv)
+
+    source = target = None
+    try:
+        public_key, private_key = load_private_key(args.key_id, args.bits)
+        source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+        target = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        start = time.perf_counter()
+        if args.operation == "encrypt":
+            size = os.fstat(source.fileno()).st_size if source is not sys.stdin.buffer else None
+            encrypt_stream(source, target, public_key, args.chunk_size)
+        else:
+            size = decrypt_stream(source, target, private_key)
+        elapsed = time.perf_counter() - start
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        for stream in (source, target):
+            if stream not in (None, sys.stdin.buffer, sys.stdout.buffer):
+                stream.close()
+
+    if size is not None and elapsed > 0:
+        print(f"{args.operation}ed {size:,} bytes in {elapsed:.2f} s ({size / elapsed / 1e6:.0f} MB/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
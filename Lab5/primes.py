@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import argparse
+import atexit
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from Crypto.Util.number import getRandomNBitInteger, isPrime
+
+CANDIDATES_PER_TASK = 64
+PREFETCH_DEPTH = 2
+MAX_READY = 16
+# A 1024-bit prime takes about 355 odd candidates, i.e. five or six batches: more workers than
+# that only adds processes, so the shared pool stays small.
+DEFAULT_WORKERS = min(os.cpu_count() or 1, 4)
+
+
+def search_prime(bits, candidates=CANDIDATES_PER_TASK):
+    # One bounded batch of random odd bits-bit candidates; None when the batch has no prime.
+    for _ in range(candidates):
+        candidate = getRandomNBitInteger(bits) | 1
+        if isPrime(candidate):
+            return candidate
+    return None
+
+
+class PrimePool:
+    __slots__ = ('workers', 'candidates', '_executor', '_ready', '_depth', '_condition', '_closed', '_thread')
+
+    def __init__(self, workers=None, candidates=CANDIDATES_PER_TASK):
+        self.workers = workers or os.cpu_count() or 1
+        self.candidates = candidates
+        self._executor = ProcessPoolExecutor(self.workers)
+        self._ready = {}
+        self._depth = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _store(self, bits, primes):
+        with self._condition:
+            ready = self._ready.setdefault(bits, deque())
+            for prime in primes:
+                if len(ready) < MAX_READY:
+                    ready.append(prime)
+
+    def _keep_late_prime(self, bits):
+        def callback(future):
+            if not future.cancelled() and future.exception() is None and future.result():
+                self._store(bits, [future.result()])
+        return callback
+
+    def search(self, bits):
+        # Every worker tests its own batch; the first prime wins and queued batches are cancelled.
+        pending = set()
+        found = []
+        while not found:
+            while len(pending) < self.workers:
+                pending.add(self._executor.submit(search_prime, bits, self.candidates))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            found.extend(future.result() for future in done if future.result())
+        for future in pending:
+            if not future.cancel():
+                # Already running: a prime it finds is kept for a later call instead of wasted.
+                future.add_done_callback(self._keep_late_prime(bits))
+        self._store(bits, found[1:])
+        return found[0]
+
+    def get_prime(self, bits):
+        with self._condition:
+            ready = self._ready.get(bits)
+            if ready:
+                prime = ready.popleft()
+                self._condition.notify_all()
+                return prime
+        return self.search(bits)
+
+    def prefetch(self, bits, depth=PREFETCH_DEPTH):
+        # Keep `depth` primes of this size ready, refilled in the background as they are taken.
+        with self._condition:
+            self._depth[bits] = depth
+            self._ready.setdefault(bits, deque())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refill, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def ready(self, bits):
+        with self._condition:
+            return len(self._ready.get(bits, ()))
+
+    def _missing(self):
+        return [bits for bits, depth in self._depth.items() if len(self._ready[bits]) < depth]
+
+    def _refill(self):
+        while True:
+            with self._condition:
+                while not self._closed and not self._missing():
+                    self._condition.wait()
+                if self._closed:
+                    return
+                bits = self._missing()[0]
+            try:
+                prime = self.search(bits)
+            except RuntimeError:
+                return
+            self._store(bits, [prime])
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(cancel_futures=True)
+
+
+_default_pool = None
+
+
+def default_pool():
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = PrimePool(DEFAULT_WORKERS)
+        atexit.register(_default_pool.close)
+    return _default_pool
+
+
+def get_prime(bits):
+    return default_pool().get_prime(bits)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel prime generation with background prefetch")
+    parser.add_argument("--bits", type=int, default=1024, help="prime size in bits")
+    parser.add_argument("--count", type=int, default=8, help="primes to request")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--prefetch", type=int, default=0, help="ready primes to keep in the background")
+    parser.add_argument("--interval", type=float, default=0.0, help="seconds between requests")
+    args = parser.parse_args(argv)
+
+    with PrimePool(args.workers) as pool:
+        if args.prefetch:
+            pool.prefetch(args.bits, args.prefetch)
+        latencies = []
+        for _ in range(args.count):
+            time.sleep(args.interval)
+            start = time.perf_counter()
+            prime = pool.get_prime(args.bits)
+            latencies.append(time.perf_counter() - start)
+            assert prime.bit_length() == args.bits
+    latencies.sort()
+    print(f"{args.count} x {args.bits}-bit primes with {pool.workers} worker(s), prefetch {args.prefetch}: "
+          f"mean {sum(latencies) / len(latencies) * 1000:.1f} ms, "
+          f"median {latencies[len(latencies) // 2] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,14 @@
+import os
 import secrets
+import sys
 from math import gcd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keystore import ElGamalKey, default_path, read_key, write_key
+
+KEY_ID = "lab6-task2"
+
 def modinv(a, m):
     m0, x0, x1 = m, 0, 1
     if m == 1:
@@ -17,40 +25,62 @@ p = 3231700607131100730015351347782516336248805713348907517458843413926980683413
 g = 2
 
 WHIRLPOOL_HEX = "DA797370298016DFD13DC0B90F952102F14881088C34511558C192D92D958791FAAAFF267F286CFEAF72E418ED24C7CB854998214B34F21CAF26D9C6D4B1F975"
-h = int(WHIRLPOOL_HEX, 16)
 
-print(f"Whirlpool hash (hex): {WHIRLPOOL_HEX}")
-print(f"Whirlpool hash (decimal): {h}\n")
 
-print(f"ElGamal parameters:")
-print(f"p (2048-bit prime): {p}")
-print(f"g (generator): {g}\n")
+def generate_elgamal_key(p, g):
+    x = secrets.randbelow(p - 2) + 2
+    return ElGamalKey(p, g, pow(g, x, p), x)
+
+
+def load_elgamal_key(p, g, key_id=KEY_ID, store_path=None):
+    key = read_key("elgamal", key_id, p.bit_length(), store_path)
+    if key is not None and (key.p, key.g) == (p, g):
+        print(f"Loaded private key '{key_id}' from {store_path or default_path()}; key generation skipped.\n")
+        return key
+    key = generate_elgamal_key(p, g)
+    write_key("elgamal", key_id, p.bit_length(), key, store_path)
+    return key
+
+
+def main():
+    h = int(WHIRLPOOL_HEX, 16)
+
+    print(f"Whirlpool hash (hex): {WHIRLPOOL_HEX}")
+    print(f"Whirlpool hash (decimal): {h}\n")
+
+    print(f"ElGamal parameters:")
+    print(f"p (2048-bit prime): {p}")
+    print(f"g (generator): {g}\n")
+
+    key = load_elgamal_key(p, g)
+    x, y = key.x, key.y
+
+    print(f"Private key x: {x}")
+    print(f"Public key y = g^x mod p: {y}\n")
 
-x = secrets.randbelow(p - 2) + 2
-y = pow(g, x, p)
+    h_mod = h % (p - 1)
 
-print(f"Private key x: {x}")
-print(f"Public key y = g^x mod p: {y}\n")
+    while True:
+        k = secrets.randbelow(p - 2) + 2
+        if gcd(k, p - 1) == 1:
+            break
 
-h_mod = h % (p - 1)
+    r = pow(g, k, p)
+    k_inv = modinv(k, p - 1)
+    s = ((h_mod - x * r) * k_inv) % (p - 1)
 
-while True:
-    k = secrets.randbelow(p - 2) + 2
-    if gcd(k, p - 1) == 1:
-        break
+    print(f"Signature (r, s):")
+    print(f"r = g^k mod p: {r}")
+    print(f"s = (h - x*r) * k^(-1) mod (p-1): {s}\n")
 
-r = pow(g, k, p)
-k_inv = modinv(k, p - 1)
-s = ((h_mod - x * r) * k_inv) % (p - 1)
+    left = pow(g, h_mod, p)
+    right = (pow(y, r, p) * pow(r, s, p)) % p
 
-print(f"Signature (r, s):")
-print(f"r = g^k mod p: {r}")
-print(f"s = (h - x*r) * k^(-1) mod (p-1): {s}\n")
+    print(f"Verification:")
+    print(f"Left: g^h mod p = {left}")
+    print(f"Right: y^r * r^s mod p = {right}")
+    print("Result:", "SUCCESS" if left == right else "FAILED")
 
-left = pow(g, h_mod, p)
-right = (pow(y, r, p) * pow(r, s, p)) % p
 
-print(f"Verification:")
-print(f"Left: g^h mod p = {left}")
-print(f"Right: y^r * r^s mod p = {right}")
-print("Result:", "SUCCESS" if left == right else "FAILED")
+if __name__ == "__main__":
+    main()
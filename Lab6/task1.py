@@ -1,6 +1,14 @@
+import os
+import sys
 from sympy import randprime
 from math import gcd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keystore import default_path, make_rsa_key, read_key, write_key
+
+KEY_ID = "lab6-task1"
+
 def modinv(a, m):
     m0, x0, x1 = m, 0, 1
     if m == 1:
@@ -14,39 +22,61 @@ def modinv(a, m):
     return x1
 
 NTLM_HEX = "AE6BAA4ABE48DE6E65AA9E8DAF88AD8D"
-h = int(NTLM_HEX, 16)
 
-print(f"NTLM hash (hex): {NTLM_HEX}")
-print(f"NTLM hash (decimal): {h}\n")
 
-bits = 1536
-while True:
-    p = randprime(2**(bits - 1), 2**bits)
-    q = randprime(2**(bits - 1), 2**bits)
-    while p == q:
+def generate_rsa_key(bits=1536):
+    while True:
+        p = randprime(2**(bits - 1), 2**bits)
         q = randprime(2**(bits - 1), 2**bits)
-    n = p * q
-    if n.bit_length() >= 3072:
-        break
+        while p == q:
+            q = randprime(2**(bits - 1), 2**bits)
+        n = p * q
+        if n.bit_length() >= 2 * bits:
+            break
+
+    phi_n = (p - 1) * (q - 1)
+    e = 65537
+    if gcd(e, phi_n) != 1:
+        raise ValueError("e and phi(n) are not coprime")
+
+    d = modinv(e, phi_n)
+    return make_rsa_key(n, e, d, p, q)
+
+
+def load_rsa_key(bits=1536, key_id=KEY_ID, store_path=None):
+    key = read_key("rsa", key_id, 2 * bits, store_path)
+    if key is not None:
+        print(f"Loaded RSA key '{key_id}' from {store_path or default_path()}; key generation skipped.\n")
+        return key
+    key = generate_rsa_key(bits)
+    write_key("rsa", key_id, 2 * bits, key, store_path)
+    return key
+
+
+def main():
+    h = int(NTLM_HEX, 16)
+
+    print(f"NTLM hash (hex): {NTLM_HEX}")
+    print(f"NTLM hash (decimal): {h}\n")
+
+    key = load_rsa_key()
+    n, e, d = key.n, key.e, key.d
 
-phi_n = (p - 1) * (q - 1)
-e = 65537
-if gcd(e, phi_n) != 1:
-    raise ValueError("e and phi(n) are not coprime")
+    print(f"RSA modulus n: {n.bit_length()} bits")
+    print(f"Public key (n, e): n with {n.bit_length()} bits, e = {e}")
+    print(f"Private key (d, n): d with {d.bit_length()} bits\n")
 
-d = modinv(e, phi_n)
+    if h >= n:
+        h = h % n
 
-print(f"RSA modulus n: {n.bit_length()} bits")
-print(f"Public key (n, e): n with {n.bit_length()} bits, e = {e}")
-print(f"Private key (d, n): d with {d.bit_length()} bits\n")
+    s = pow(h, d, n)
+    print(f"Signature: s = h^d mod n = {s}\n")
 
-if h >= n:
-    h = h % n
+    v = pow(s, e, n)
+    print(f"Verification: v = s^e mod n = {v}")
+    print(f"Expected h = {h}")
+    print("Result:", "SUCCESS" if v == h else "FAILED")
 
-s = pow(h, d, n)
-print(f"Signature: s = h^d mod n = {s}\n")
 
-v = pow(s, e, n)
-print(f"Verification: v = s^e mod n = {v}")
-print(f"Expected h = {h}")
-print("Result:", "SUCCESS" if v == h else "FAILED")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+from functools import lru_cache
+
+import numpy as np
+
+
+class Alphabet:
+    __slots__ = ('letters', 'size', 'index', 'letter_set', 'codepoints', 'lookup', 'is_ascii',
+                 'shift_tables', 'shift_bytes_tables')
+
+    def __init__(self, letters):
+        letters = letters.upper()
+        if len(set(letters)) != len(letters):
+            raise ValueError(f"Alphabet letters must be unique: '{letters}'")
+        self.letters = letters
+        self.size = len(letters)
+        self.index = {}
+        for number, letter in enumerate(letters):
+            self.index[letter] = number
+            self.index[letter.lower()] = number
+        self.letter_set = frozenset(self.index)
+
+        self.codepoints = np.array([ord(letter) for letter in letters], dtype=np.uint32)
+        self.lookup = np.full(max(ord(letter) for letter in self.index) + 1, -1, dtype=np.int8)
+        for letter, number in self.index.items():
+            self.lookup[ord(letter)] = number
+
+        # Translate tables fold lowercase to uppercase and drop spaces, like preprocess_text.
+        self.is_ascii = letters.isascii()
+        self.shift_tables = []
+        self.shift_bytes_tables = []
+        source = letters + letters.lower()
+        for shift in range(self.size):
+            shifted = letters[shift:] + letters[:shift]
+            self.shift_tables.append(str.maketrans(source, shifted + shifted, ' '))
+            if self.is_ascii:
+                self.shift_bytes_tables.append(bytes.maketrans(source.encode('ascii'), (shifted + shifted).encode('ascii')))
+
+    def __repr__(self):
+        return f"Alphabet('{self.letters}')"
+
+    def __len__(self):
+        return self.size
+
+    def number(self, letter):
+        try:
+            return self.index[letter]
+        except KeyError:
+            raise ValueError(f"'{letter}' is not in the alphabet") from None
+
+    def letter(self, number):
+        return self.letters[number % self.size]
+
+    def validate(self, text):
+        return self.letter_set.issuperset(text)
+
+    def shift_table(self, shift):
+        return self.shift_tables[shift % self.size]
+
+    def shift_bytes_table(self, shift):
+        if not self.is_ascii:
+            raise ValueError(f"{self!r} has non-ASCII letters and no bytes tables")
+        return self.shift_bytes_tables[shift % self.size]
+
+    def to_indices(self, text):
+        codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        indices = np.full(len(codepoints), -1, dtype=np.int8)
+        known = codepoints < len(self.lookup)
+        indices[known] = self.lookup[codepoints[known]]
+        return indices, codepoints
+
+    def from_indices(self, indices):
+        return self.codepoints[indices].tobytes().decode('utf-32-le')
+
+
+LATIN = Alphabet("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+ROMANIAN = Alphabet("AĂÂBCDEFGHIÎJKLMNOPQRSTȘȚUVWXYZ")
+
+
+def permuted_letters(keyword, base=LATIN):
+    prefix = ''.join(dict.fromkeys(keyword.upper()))
+    used = set(prefix)
+    return prefix + ''.join(letter for letter in base.letters if letter not in used)
+
+
+@lru_cache(maxsize=256)
+def keyword_alphabet(keyword, base=LATIN):
+    return Alphabet(permuted_letters(keyword, base))
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from labs import load_lab_module
+
+caesar = load_lab_module("Lab1", "Task1.py")
+caesar2 = load_lab_module("Lab1", "Task2.py")
+vigenere = load_lab_module("Lab3", "Task1.py")
+
+CHUNK_RECORDS = 5000
+
+
+def is_shift(value):
+    # JSON true and 3.9 would pass int(); only integers and digit strings are shifts.
+    return not isinstance(value, bool) and isinstance(value, (int, str)) and caesar.validate_key(value)
+
+
+def normalize_keys(cipher, keys):
+    if isinstance(keys, dict):
+        names = {"caesar": ("key",), "caesar2": ("key1", "key2"), "vigenere": ("key",)}[cipher]
+        keys = [keys[name] for name in names]
+    elif not isinstance(keys, (list, tuple)):
+        keys = [keys]
+    keys = tuple(keys)
+
+    if cipher == "caesar":
+        if len(keys) != 1 or not is_shift(keys[0]):
+            raise ValueError("caesar needs one key between 1 and 25")
+        return (int(keys[0]),)
+    if cipher == "caesar2":
+        if (len(keys) != 2 or not is_shift(keys[0]) or not isinstance(keys[1], str)
+                or not caesar2.validate_key2(keys[1])):
+            raise ValueError("caesar2 needs key1 between 1 and 25 and key2 with at least 7 Latin letters")
+        return int(keys[0]), keys[1]
+    if len(keys) != 1 or not isinstance(keys[0], str) or not vigenere.validate_key(keys[0]):
+        raise ValueError("vigenere needs one key with at least 7 letters")
+    return (str(keys[0]),)
+
+
+def compile_group(cipher, op, keys):
+    if cipher == "caesar":
+        shift = keys[0] if op == "encrypt" else -keys[0]
+        return lambda text: caesar.caesar_transform(text, shift)
+    if cipher == "caesar2":
+        compiled = caesar2.compile_keys(*keys)
+        translate = compiled.encrypt if op == "encrypt" else compiled.decrypt
+        return lambda text: translate(caesar2.preprocess_text(text))
+    if op == "encrypt":
+        return lambda text: vigenere.encrypt_vigenere(vigenere.preprocess_text(text), keys[0])
+    return lambda text: vigenere.decrypt_vigenere(vigenere.preprocess_text(text), keys[0])
+
+
+def parse_record(line):
+    record = json.loads(line)
+    cipher = record["cipher"]
+    op = record["op"]
+    if cipher not in ("caesar", "caesar2", "vigenere"):
+        raise ValueError(f"unknown cipher '{cipher}'")
+    if op not in ("encrypt", "decrypt"):
+        raise ValueError(f"unknown op '{op}'")
+    if not isinstance(record["text"], str):
+        raise TypeError("text must be a string")
+    return (cipher, op, normalize_keys(cipher, record["keys"])), record["text"]
+
+
+def process_chunk(lines):
+    results = [None] * len(lines)
+    groups = {}
+    for index, line in enumerate(lines):
+        try:
+            group, text = parse_record(line)
+        except (ValueError, KeyError, TypeError) as e:
+            results[index] = {"error": str(e) or type(e).__name__}
+            continue
+        groups.setdefault(group, []).append((index, text))
+
+    for (cipher, op, keys), items in groups.items():
+        try:
+            transform = compile_group(cipher, op, keys)
+        except ValueError as e:
+            # A key that cannot be compiled fails every record of its group, not the job.
+            for index, _ in items:
+                results[index] = {"error": str(e)}
+            continue
+        for index, text in items:
+            try:
+                results[index] = {"result": transform(text)}
+            except ValueError as e:
+                results[index] = {"error": str(e)}
+
+    return "".join(json.dumps(result, ensure_ascii=False) + "\n" for result in results)
+
+
+def read_chunks(source, chunk_records):
+    lines = (line for line in source if line.strip())
+    while True:
+        chunk = list(islice(lines, chunk_records))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(source, target, workers=None, chunk_records=CHUNK_RECORDS):
+    workers = workers or os.cpu_count() or 1
+    total = 0
+    if workers == 1:
+        for chunk in read_chunks(source, chunk_records):
+            target.write(process_chunk(chunk))
+            total += len(chunk)
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in read_chunks(source, chunk_records):
+            pending.append((pool.submit(process_chunk, chunk), len(chunk)))
+            if len(pending) >= 2 * workers:
+                future, count = pending.popleft()
+                target.write(future.result())
+                total += count
+        while pending:
+            future, count = pending.popleft()
+            target.write(future.result())
+            total += count
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch encryption of JSONL jobs with the classical ciphers")
+    parser.add_argument("input", help="JSONL file of {cipher, op, keys, text} records ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output JSONL file ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--chunk-records", type=int, default=CHUNK_RECORDS, help="records sent to a worker at once")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        total = run_batch(source, target, args.workers, args.chunk_records)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    elapsed = time.perf_counter() - start
+
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"Processed {total} records in {elapsed:.3f} s ({rate:.0f} records/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no flock; the first byte of the store is locked with msvcrt instead.
+    fcntl = None
+    import msvcrt
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(ROOT, "keystore.bin")
+PATH_VARIABLE = "LAB_KEY_STORE"
+
+MAGIC = b"LABKEYS\x01"
+# kind code, field count, key size in bits, key id length, payload length
+RECORD_HEADER = struct.Struct(">BBHHI")
+FIELD_LENGTH = struct.Struct(">I")
+
+RSAKey = namedtuple("RSAKey", "n e d p q dp dq qinv")
+ElGamalKey = namedtuple("ElGamalKey", "p g y x")
+
+KINDS = {"rsa": (1, RSAKey), "elgamal": (2, ElGamalKey)}
+KIND_NAMES = {code: name for name, (code, _) in KINDS.items()}
+
+
+def make_rsa_key(n, e, d, p, q):
+    # The CRT parameters are stored with the key so a loaded key never recomputes them.
+    return RSAKey(n, e, d, p, q, d % (p - 1), d % (q - 1), pow(q, -1, p))
+
+
+def default_path():
+    return os.environ.get(PATH_VARIABLE) or DEFAULT_PATH
+
+
+def lock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def unlock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def encode_record(kind, key_id, bits, key):
+    code, key_type = KINDS[kind]
+    if not isinstance(key, key_type):
+        key = key_type(*key)
+    name = key_id.encode("utf-8")
+    parts = [name]
+    for value in key:
+        data = value.to_bytes((value.bit_length() + 7) // 8, "big")
+        parts.append(FIELD_LENGTH.pack(len(data)))
+        parts.append(data)
+    payload = b"".join(parts)
+    return RECORD_HEADER.pack(code, len(key), bits, len(name), len(payload)) + payload
+
+
+class KeyStore:
+    __slots__ = ('path', '_file', '_mapped', '_index', '_cache', '_end')
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        if not os.path.exists(self.path):
+            descriptor = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(descriptor, "wb") as target:
+                target.write(MAGIC)
+        self._file = open(self.path, "r+b")
+        self._mapped = None
+        self._index = {}
+        self._cache = {}
+        self._end = len(MAGIC)
+        self._remap()
+        if self._mapped[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"'{self.path}' is not a key store.")
+        self._scan()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, entry):
+        return tuple(entry) in self._index
+
+    def _remap(self):
+        if self._mapped is not None:
+            self._mapped.close()
+        self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _scan(self):
+        # Only the record headers are read here; key material is parsed on first use.
+        previous, self._index = self._index, {}
+        offset, size = len(MAGIC), len(self._mapped)
+        while offset + RECORD_HEADER.size <= size:
+            code, fields, bits, name_length, payload_length = RECORD_HEADER.unpack_from(self._mapped, offset)
+            start = offset + RECORD_HEADER.size
+            if code not in KIND_NAMES or start + payload_length > size:
+                break
+            key_id = bytes(self._mapped[start:start + name_length]).decode("utf-8")
+            # Records are appended, so a later record for the same key replaces the earlier one.
+            self._index[(KIND_NAMES[code], key_id, bits)] = (start + name_length, fields, payload_length - name_length)
+            offset = start + payload_length
+        self._end = offset
+        # Keys replaced by another process since the last scan are parsed again.
+        for entry, location in previous.items():
+            if self._index.get(entry) != location:
+                self._cache.pop(entry, None)
+
+    def entries(self):
+        return sorted((kind, key_id, bits, length) for (kind, key_id, bits), (_, _, length) in self._index.items())
+
+    def get(self, kind, key_id, bits):
+        entry = (kind, key_id, bits)
+        if entry in self._cache:
+            return self._cache[entry]
+        location = self._index.get(entry)
+        if location is None:
+            return None
+        offset, fields, _ = location
+        values = []
+        for _ in range(fields):
+            (length,) = FIELD_LENGTH.unpack_from(self._mapped, offset)
+            offset += FIELD_LENGTH.size
+            values.append(int.from_bytes(self._mapped[offset:offset + length], "big"))
+            offset += length
+        key = KINDS[kind][1](*values)
+        self._cache[entry] = key
+        return key
+
+    def put(self, kind, key_id, bits, key):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown key kind '{kind}'. Choose one of: {', '.join(KINDS)}.")
+        record = encode_record(kind, key_id, bits, key)
+        # Other processes may have appended since this store was opened: the real end of the
+        # file is only known under the lock, and only then is a torn tail safe to drop.
+        lock_file(self._file)
+        try:
+            self._remap()
+            self._scan()
+            self._mapped.close()
+            self._mapped = None
+            self._file.truncate(self._end)
+            self._file.seek(self._end)
+            self._file.write(record)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._remap()
+            self._scan()
+        finally:
+            unlock_file(self._file)
+        return self.get(kind, key_id, bits)
+
+    def close(self):
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+        self._file.close()
+
+
+def read_key(kind, key_id, bits, path=None):
+    # A store that cannot be opened or created (a read-only checkout, say) counts as empty,
+    # so the scripts generate their keys in memory instead of failing.
+    try:
+        with KeyStore(path) as store:
+            return store.get(kind, key_id, bits)
+    except OSError as e:
+        print(f"Warning: key store unavailable ({e}); keys are generated in memory.", file=sys.stderr)
+        return None
+
+
+def write_key(kind, key_id, bits, key, path=None):
+    # Returns whether the key was saved; a store that cannot be written only costs a warning.
+    try:
+        with KeyStore(path) as store:
+            store.put(kind, key_id, bits, key)
+        return True
+    except OSError as e:
+        print(f"Warning: key not saved ({e}).", file=sys.stderr)
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the key store shared by the lab scripts")
+    parser.add_argument("--path", default=None, help=f"key store file (default: ${PATH_VARIABLE} or {DEFAULT_PATH})")
+    parser.add_argument("--clear", action="store_true", help="delete the key store so keys are generated again")
+    args = parser.parse_args(argv)
+
+    path = args.path or default_path()
+    if args.clear:
+        if os.path.exists(path):
+            os.remove(path)
+        print(f"Removed {path}")
+        return 0
+    if not os.path.exists(path):
+        print(f"No key store at {path}")
+        return 0
+    try:
+        with KeyStore(path) as store:
+            for kind, key_id, bits, length in store.entries():
+                print(f"{kind:8} {bits:5d} bits  {length:6d} bytes  {key_id}")
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
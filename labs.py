@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_lab_module(lab, filename):
+    name = f"{lab}_{os.path.splitext(filename)[0]}".lower().replace('.', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+
+    lab_dir = os.path.join(ROOT, lab)
+    if lab_dir not in sys.path:
+        sys.path.append(lab_dir)
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(lab_dir, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from math import lcm
+
+import numpy as np
+
+from alphabet import LATIN, ROMANIAN, Alphabet, keyword_alphabet
+
+MAX_FUSED_ENTRIES = 1 << 22
+
+
+class Stage:
+    __slots__ = ('name', 'alphabet', 'table')
+
+    def __init__(self, name, alphabet, table):
+        self.name = name
+        self.alphabet = alphabet
+        self.table = np.asarray(table, dtype=np.int16).reshape(-1, alphabet.size)
+
+    def __repr__(self):
+        return f"Stage({self.name}, period={self.period})"
+
+    @property
+    def period(self):
+        return len(self.table)
+
+
+def shift_stage(name, alphabet, shifts):
+    letters = np.arange(alphabet.size)
+    shifts = np.asarray(shifts, dtype=np.int64)[:, None]
+    return Stage(name, alphabet, (letters[None, :] + shifts) % alphabet.size)
+
+
+def caesar_stage(key, decrypt=False):
+    key = int(key)
+    if not 1 <= key <= 25:
+        raise ValueError("Invalid key. Please enter a number between 1 and 25 inclusive.")
+    return shift_stage(f"caesar({key})", LATIN, [-key if decrypt else key])
+
+
+def permuted_caesar_stage(key1, key2, decrypt=False):
+    key1 = int(key1)
+    if not 1 <= key1 <= 25:
+        raise ValueError("Invalid key 1. Please enter a number between 1 and 25 inclusive.")
+    if len(key2) < 7 or not LATIN.validate(key2):
+        raise ValueError("Invalid key 2. Please enter only Latin letters with at least 7 characters.")
+    return shift_stage(f"caesar2({key1}, {key2.upper()})", keyword_alphabet(key2.upper()), [-key1 if decrypt else key1])
+
+
+def vigenere_stage(key, decrypt=False):
+    if len(key) < 7 or not ROMANIAN.validate(key):
+        raise ValueError("Invalid key. Please enter at least 7 characters using only Romanian letters.")
+    shifts = ROMANIAN.to_indices(key)[0].astype(np.int64)
+    return shift_stage(f"vigenere({key.upper()})", ROMANIAN, -shifts if decrypt else shifts)
+
+
+def union_alphabet(stages):
+    letters = []
+    for stage in stages:
+        letters.extend(letter for letter in stage.alphabet.letters if letter not in letters)
+    return Alphabet(''.join(letters))
+
+
+def stage_over_union(stage, union):
+    # Row r maps union letter u to the union index of its image, or -1 when the
+    # stage's alphabet does not contain u.
+    table = np.full((stage.period, union.size), -1, dtype=np.int16)
+    to_union = np.array([union.index[letter] for letter in stage.alphabet.letters], dtype=np.int16)
+    for u, letter in enumerate(union.letters):
+        if letter in stage.alphabet.index:
+            table[:, u] = to_union[stage.table[:, stage.alphabet.index[letter]]]
+    return table
+
+
+def compose(first, second):
+    period = lcm(len(first), len(second))
+    rows = np.arange(period)
+    left = first[rows % len(first)]
+    right = second[rows % len(second)]
+    composed = np.take_along_axis(right, np.maximum(left, 0).astype(np.int64), axis=1)
+    composed[left < 0] = -1
+    return composed
+
+
+class Pipeline:
+    __slots__ = ('stages', 'alphabet', 'tables', 'passes')
+
+    def __init__(self, stages, max_fused_entries=MAX_FUSED_ENTRIES):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage.")
+        self.stages = list(stages)
+        self.alphabet = union_alphabet(self.stages)
+        self.tables = [stage_over_union(stage, self.alphabet) for stage in self.stages]
+
+        # The first stage sees the original text, so its key advances over every character,
+        # like Lab3's vigenere_transform. Its output has only letters, so every later stage
+        # keys on letter ranks. Tables are fused only within one phase; a period-1 table has
+        # no phase and joins the letter-rank pass.
+        self.passes = []
+        for index, table in enumerate(self.tables):
+            by_text = index == 0 and len(table) > 1
+            if self.passes and self.passes[-1][0] == by_text:
+                fused = self.passes[-1][1]
+                if lcm(len(fused), len(table)) * self.alphabet.size <= max_fused_entries:
+                    self.passes[-1] = (by_text, compose(fused, table))
+                    continue
+            self.passes.append((by_text, table))
+
+    def __repr__(self):
+        periods = ', '.join(str(len(table)) for _, table in self.passes)
+        return f"Pipeline({' -> '.join(stage.name for stage in self.stages)}; passes with periods {periods})"
+
+    def letter_indices(self, text):
+        # Returns the letters and their positions among all characters of the text.
+        indices, codepoints = self.alphabet.to_indices(text)
+        positions = np.arange(len(indices))
+        letters = indices >= 0
+        if not letters.all():
+            unknown = np.unique(codepoints[~letters]).tolist()
+            if any(chr(codepoint).isalpha() for codepoint in unknown):
+                raise ValueError("Invalid characters. The text contains letters outside the pipeline alphabets.")
+            indices, positions = indices[letters], positions[letters]
+        return indices.astype(np.int64), positions
+
+    def run(self, text):
+        indices, positions = self.letter_indices(text)
+        ranks = np.arange(len(indices))
+        for by_text, table in self.passes:
+            rows = (positions if by_text else ranks) % len(table)
+            indices = table[rows, indices].astype(np.int64)
+            if (indices < 0).any():
+                raise ValueError("Invalid characters. A letter is not in the alphabet of one of the stages.")
+        return self.alphabet.from_indices(indices)
+
+    def inverse(self):
+        return Pipeline([Stage(f"inverse {stage.name}", stage.alphabet, np.argsort(stage.table, axis=1))
+                         for stage in reversed(self.stages)])
+
+
+def parse_stage(spec, decrypt=False):
+    name, _, keys = spec.partition(':')
+    keys = keys.split(',') if keys else []
+    if name == "caesar" and len(keys) == 1:
+        return caesar_stage(keys[0], decrypt)
+    if name == "caesar2" and len(keys) == 2:
+        return permuted_caesar_stage(keys[0], keys[1], decrypt)
+    if name == "vigenere" and len(keys) == 1:
+        return vigenere_stage(keys[0], decrypt)
+    raise ValueError(f"Invalid stage '{spec}'. Use caesar:K, caesar2:K1,K2 or vigenere:KEY.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a chain of classical ciphers in a single pass")
+    parser.add_argument("operation", choices=["encrypt", "decrypt"])
+    parser.add_argument("stages", nargs="+", help="stages in encryption order, e.g. caesar2:3,KEYWORDS vigenere:CHEIESECRETA")
+    parser.add_argument("-i", "--input", default="-", help="input file ('-' for stdin)")
+    args = parser.parse_args(argv)
+
+    try:
+        pipeline = Pipeline([parse_stage(spec) for spec in args.stages])
+        if args.operation == "decrypt":
+            pipeline = pipeline.inverse()
+        source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        with source:
+            text = source.read()
+        print(pipeline.run(text))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(pipeline, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+import argparse
+import mmap
+import os
+import sys
+
+import numpy as np
+
+from labs import load_lab_module
+
+caesar = load_lab_module("Lab1", "Task1.py")
+vigenere = load_lab_module("Lab3", "Task1.py")
+
+INDEX_BLOCK = 4096
+INDEX_SCAN_CHUNK = 1 << 24
+INDEX_SUFFIX = ".idx.npy"
+INDEX_VERSION = 2
+
+
+def build_char_index(data, block=INDEX_BLOCK, chunk_size=INDEX_SCAN_CHUNK):
+    offsets = []
+    total_chars = 0
+    for start in range(0, len(data), chunk_size):
+        chunk = np.frombuffer(data, dtype=np.uint8, count=min(chunk_size, len(data) - start), offset=start)
+        # Every byte that is not a UTF-8 continuation byte starts a character.
+        leads = np.flatnonzero((chunk & 0xC0) != 0x80)
+        first = (-total_chars) % block
+        offsets.append(leads[first::block] + start)
+        total_chars += len(leads)
+    offsets = np.concatenate(offsets) if offsets else np.zeros(0, dtype=np.int64)
+    return offsets.astype(np.uint64), total_chars
+
+
+class SeekableCiphertext:
+    __slots__ = ('path', 'cipher', 'key', 'block', 'offsets', 'total_chars', '_file', '_mapped')
+
+    def __init__(self, path, cipher, key, block=INDEX_BLOCK, use_index_file=True):
+        if cipher == "caesar":
+            if not caesar.validate_key(key):
+                raise ValueError("Invalid key. Please enter a number between 1 and 25 inclusive.")
+            key = int(key)
+        elif cipher == "vigenere":
+            vigenere.key_to_indices(key)
+        else:
+            raise ValueError(f"Unknown cipher '{cipher}'. Choose 'caesar' or 'vigenere'.")
+        self.path = path
+        self.cipher = cipher
+        self.key = key
+        self.block = block
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        self.offsets, self.total_chars = self._load_index(stat, use_index_file)
+
+    def _load_index(self, stat, use_index_file):
+        # The sidecar is only trusted for the same file size and modification time: a rewrite with
+        # the same length can still move the multi-byte characters.
+        index_path = self.path + INDEX_SUFFIX
+        header = np.array([INDEX_VERSION, stat.st_size, stat.st_mtime_ns, self.block, 0], dtype=np.uint64)
+        if use_index_file and os.path.exists(index_path):
+            try:
+                stored = np.load(index_path)
+            except (OSError, ValueError):
+                stored = np.zeros(0, dtype=np.uint64)
+            if len(stored) >= len(header) and (stored[:4] == header[:4]).all():
+                return stored[len(header):], int(stored[4])
+        offsets, total_chars = build_char_index(self._mapped, self.block)
+        if use_index_file:
+            header[4] = total_chars
+            try:
+                with open(index_path, "wb") as target:
+                    np.save(target, np.concatenate([header, offsets]))
+            except OSError:
+                # Read-only location: keep the index in memory only.
+                pass
+        return offsets, total_chars
+
+    def __len__(self):
+        return self.total_chars
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if isinstance(self._mapped, mmap.mmap):
+            self._mapped.close()
+        self._file.close()
+
+    def read_ciphertext(self, start, count):
+        if start < 0 or start > self.total_chars:
+            raise IndexError(f"Offset {start} is outside the ciphertext (0-{self.total_chars}).")
+        end = min(start + max(count, 0), self.total_chars)
+        if end == start:
+            return ""
+        first_block = start // self.block
+        last_block = (end - 1) // self.block + 1
+        byte_start = int(self.offsets[first_block])
+        byte_end = int(self.offsets[last_block]) if last_block < len(self.offsets) else len(self._mapped)
+        text = self._mapped[byte_start:byte_end].decode("utf-8")
+        local = start - first_block * self.block
+        return text[local:local + end - start]
+
+    def decrypt_range(self, start, count):
+        ciphertext = self.read_ciphertext(start, count)
+        if self.cipher == "caesar":
+            return caesar.decrypt_caesar(ciphertext, self.key)
+        return vigenere.decrypt_vigenere(ciphertext, self.key, offset=start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decrypt an arbitrary character range of a ciphertext file")
+    parser.add_argument("cipher", choices=["caesar", "vigenere"])
+    parser.add_argument("path", help="ciphertext file (UTF-8)")
+    parser.add_argument("-k", "--key", required=True)
+    parser.add_argument("--start", type=int, default=0, help="first character offset")
+    parser.add_argument("--count", type=int, default=100, help="number of characters to decrypt")
+    parser.add_argument("--no-index-file", action="store_true", help=f"do not read or write the {INDEX_SUFFIX} sidecar")
+    args = parser.parse_args(argv)
+
+    try:
+        with SeekableCiphertext(args.path, args.cipher, args.key, use_index_file=not args.no_index_file) as reader:
+            print(reader.decrypt_range(args.start, args.count))
+    except (ValueError, IndexError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Lab1 and Lab3 both have a Task1.py; cryptanalysis needs the Lab3 one.
+sys.path.insert(0, os.path.join(ROOT, "Lab3"))
+
+import cryptanalysis
+from Task1 import encrypt_vigenere
+
+WORDS = ("SI IN DE LA CU PE ESTE SUNT CARE ACEST PENTRU MAI DIN FOST DAR ASA CA TIMP ORASUL OAMENII "
+         "CASA DRUMUL APA MUNTE PADURE COPIII SCOALA LUMEA VIATA NOAPTE ZIUA SOARELE FRUMOS MARE MIC "
+         "LUCRU CARTE RAMANE MERGE VINE SPUNE FACE VEDE STIE").split()
+
+
+def ciphertext(seed, words, key):
+    text = ''.join(np.random.default_rng(seed).choice(WORDS, words))
+    return cryptanalysis.ciphertext_indices(encrypt_vigenere(text, key))
+
+
+def test_folded_ioc_matches_direct_histograms():
+    indices = np.random.default_rng(0).integers(0, cryptanalysis.ALPHABET_SIZE, 5000)
+    lengths = list(range(1, 41))
+    direct = [float(cryptanalysis.index_of_coincidence(cryptanalysis.column_histograms(indices, length)).mean())
+              for length in lengths]
+    assert np.allclose(cryptanalysis.ioc_for_lengths(indices, lengths), direct)
+
+
+def test_kasiski_rejects_a_divisor_that_passes_the_ioc_test(monkeypatch):
+    indices = ciphertext(1, 150, "MUNTELEALB")
+    assert cryptanalysis.estimate_key_length(indices)[0] == 10
+    monkeypatch.setattr(cryptanalysis, "KASISKI_MIN_DISTANCES", len(indices))
+    assert cryptanalysis.estimate_key_length(indices)[0] == 5
@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from labs import load_lab_module
+from pipeline import Pipeline, caesar_stage, permuted_caesar_stage, vigenere_stage
+
+caesar2 = load_lab_module("Lab1", "Task2.py")
+vigenere = load_lab_module("Lab3", "Task1.py")
+
+TEXT = "HELLO WORLD, ACESTA ESTE UN TEST CU SPATII SI PUNCTUATIE!"
+
+
+def letters(text):
+    return ''.join(character for character in text if character.isalpha())
+
+
+def test_chain_matches_the_lab_scripts():
+    pipeline = Pipeline([permuted_caesar_stage(3, "KEYWORDS"), vigenere_stage("CHEIESECRETA")])
+    expected = vigenere.encrypt_vigenere(caesar2.compile_keys(3, "KEYWORDS").encrypt(TEXT), "CHEIESECRETA")
+    assert pipeline.run(TEXT) == expected
+
+
+def test_first_stage_keys_on_every_character_and_later_stages_on_letters():
+    pipeline = Pipeline([vigenere_stage("CHEIESECRETA"), vigenere_stage("ALTACHEIE")])
+    assert len(pipeline.passes) == 2
+    expected = vigenere.encrypt_vigenere(vigenere.encrypt_vigenere(TEXT, "CHEIESECRETA"), "ALTACHEIE")
+    assert pipeline.run(TEXT) == expected
+
+
+def test_later_stages_are_fused():
+    pipeline = Pipeline([caesar_stage(3), vigenere_stage("CHEIESECRETA"), vigenere_stage("ALTACHEIE")])
+    assert [len(table) for _, table in pipeline.passes] == [36]
+    assert Pipeline(pipeline.stages, max_fused_entries=0).run(TEXT) == pipeline.run(TEXT)
+
+
+def test_inverse_round_trips_text_with_spaces():
+    pipeline = Pipeline([permuted_caesar_stage(3, "KEYWORDS"), vigenere_stage("CHEIESECRETA")])
+    assert pipeline.inverse().run(pipeline.run(TEXT)) == letters(TEXT)